@@ -61,6 +61,10 @@ def main() -> int:
         "--collect-submodules",
         "PIL",
         "--hidden-import",
+        "numpy",
+        "--hidden-import",
+        "sounddevice",
+        "--hidden-import",
         "PySide6.QtCore",
         "--hidden-import",
         "PySide6.QtGui",
@@ -0,0 +1,65 @@
+class DummyAuth:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class DummyASRService:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class DummyRecognitionConfig:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class DummyAudioEncoding:
+    LINEAR_PCM = "LINEAR_PCM"
+
+
+class DummyInputStream:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class DummyController:
+    def type(self, text):
+        pass
+
+
+class DummyListener:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def join(self, timeout=None):
+        pass
+
+    def suppress_event(self):
+        pass
+
+
+class DummyKey:
+    esc = "esc"
+    ctrl = "ctrl"
+    ctrl_l = "ctrl_l"
+    ctrl_r = "ctrl_r"
+    shift = "shift"
+    shift_l = "shift_l"
+    shift_r = "shift_r"
+    left = "left"
+    right = "right"
@@ -0,0 +1,166 @@
+import collections
+import contextlib
+import copy
+import importlib
+import queue
+import threading
+import types
+
+import pytest
+
+import _stubs
+
+
+def _install_riva(mods) -> None:
+    riva_module = types.ModuleType("riva")
+    client_module = types.ModuleType("riva.client")
+    client_module.Auth = _stubs.DummyAuth
+    client_module.ASRService = _stubs.DummyASRService
+    client_module.RecognitionConfig = _stubs.DummyRecognitionConfig
+    client_module.AudioEncoding = _stubs.DummyAudioEncoding
+    riva_module.client = client_module
+    mods["riva"] = riva_module
+    mods["riva.client"] = client_module
+
+
+def _install_sounddevice(mods) -> None:
+    sd_module = types.ModuleType("sounddevice")
+    sd_module.InputStream = _stubs.DummyInputStream
+    mods["sounddevice"] = sd_module
+
+
+def _install_dotenv(mods) -> None:
+    dotenv_module = types.ModuleType("dotenv")
+    dotenv_module.load_dotenv = lambda: None
+    mods["dotenv"] = dotenv_module
+
+
+def _install_pynput(mods) -> None:
+    pynput_module = types.ModuleType("pynput")
+    keyboard_module = types.ModuleType("pynput.keyboard")
+    keyboard_module.Controller = _stubs.DummyController
+    keyboard_module.Listener = _stubs.DummyListener
+    keyboard_module.Key = _stubs.DummyKey
+    keyboard_module.KeyCode = object
+    pynput_module.keyboard = keyboard_module
+    mods["pynput"] = pynput_module
+    mods["pynput.keyboard"] = keyboard_module
+
+
+_STUB_INSTALLERS = {
+    "riva.client": _install_riva,
+    "sounddevice": _install_sounddevice,
+    "dotenv": _install_dotenv,
+    "pynput.keyboard": _install_pynput,
+}
+
+
+def _install_dependency_stubs() -> None:
+    mods = importlib.sys.modules
+    needed = _STUB_INSTALLERS.keys() - mods.keys()
+    if not needed:
+        return
+    for name in needed:
+        _STUB_INSTALLERS[name](mods)
+
+
+def _cached(name: str):
+    module = importlib.sys.modules.get(name)
+    return module if module is not None else importlib.import_module(name)
+
+
+_install_dependency_stubs()
+ptt_whisper = _cached("whispertocode.app")
+cli_module = _cached("whispertocode.cli")
+overlay_module = _cached("whispertocode.overlay")
+tray_support = _cached("whispertocode.tray_support")
+hotkeys_support = _cached("whispertocode.hotkeys_support")
+audio_support = _cached("whispertocode.audio_support")
+
+
+@contextlib.contextmanager
+def swap_attr(obj, name: str, value):
+    previous = getattr(obj, name)
+    setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        setattr(obj, name, previous)
+
+
+class _RecordingKeyboard:
+    def __init__(self) -> None:
+        self.typed = []
+
+    def type(self, text) -> None:
+        self.typed.append(text)
+
+
+_APP_DEFAULTS = {
+    "sample_rate": 16000,
+    "audio_blocksize": 256,
+    "language": "en-US",
+    "asr_service": None,
+    "_streaming_asr": True,
+    "hold_delay_sec": 0.5,
+    "_settings_request_source": "",
+    "_output_mode": ptt_whisper.OUTPUT_MODE_RAW,
+    "_tray_enabled": False,
+    "_tray_icon": None,
+    "_debug_console": False,
+    "_console_visible": False,
+    "_overlay_controller": None,
+    "_recording": False,
+    "_transcribing": False,
+    "_ctrl_count": 0,
+    "_press_token": 0,
+    "_hold_thread": None,
+    "_stream": None,
+    "_capture_buf": None,
+    "_capture_len": 0,
+    "_level_thread": None,
+    "_peak_level": 0.05,
+    "_min_level": 0.01,
+    "_level_ema": 0.02,
+}
+
+
+def _new_app(**overrides) -> "ptt_whisper.HoldToTalkRiva":
+    app = ptt_whisper.HoldToTalkRiva.__new__(ptt_whisper.HoldToTalkRiva)
+    for name, value in {**_APP_DEFAULTS, **overrides}.items():
+        setattr(app, name, value)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def _silence_print(monkeypatch) -> None:
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: None)
+
+
+@pytest.fixture(scope="session")
+def np():
+    import numpy
+
+    return numpy
+
+
+@pytest.fixture(scope="session")
+def _app_template() -> "ptt_whisper.HoldToTalkRiva":
+    return _new_app()
+
+
+@pytest.fixture
+def app(_app_template) -> "ptt_whisper.HoldToTalkRiva":
+    # Shallow copy shares only immutable defaults; threading primitives and
+    # mutable containers are re-created so tests never observe each other.
+    app = copy.copy(_app_template)
+    app._lock = threading.Lock()
+    app._stop_event = threading.Event()
+    app._settings_request_event = threading.Event()
+    app._keyboard = _RecordingKeyboard()
+    app._hold_requests = queue.SimpleQueue()
+    app._hold_cancel = threading.Event()
+    app._level_blocks = collections.deque(maxlen=64)
+    app._level_wake = threading.Event()
+    app._audio_log = collections.deque(maxlen=256)
+    return app
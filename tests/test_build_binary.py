@@ -38,6 +38,12 @@ class BuildBinaryTests(unittest.TestCase):
         cmd = mock_run.call_args.kwargs.get("args", mock_run.call_args.args[0])
         self.assertIn("--noconsole", cmd)
         self.assertIn("PySide6.QtCore", cmd)
+        # numpy/sounddevice are only reached via lazy_import(), which
+        # PyInstaller's analysis can't follow.
+        for module in ("numpy", "sounddevice"):
+            index = cmd.index(module)
+            self.assertEqual(cmd[index - 1], "--hidden-import")
+        self.assertIn("riva", cmd)
         self.assertEqual(cmd[-1], "run_whispertocode.py")
 
 
@@ -1,60 +1,69 @@
 import importlib
+import os
+import tempfile
 import types
 import unittest
 from pathlib import Path
 from unittest import mock
 
+from conftest import cli_module
 
-def _install_dependency_stubs() -> None:
-    if "riva.client" not in importlib.sys.modules:
-        riva_module = types.ModuleType("riva")
-        client_module = types.ModuleType("riva.client")
-        client_module.Auth = object
-        client_module.ASRService = object
-        client_module.RecognitionConfig = object
-        client_module.AudioEncoding = types.SimpleNamespace(LINEAR_PCM="LINEAR_PCM")
-        riva_module.client = client_module
-        importlib.sys.modules["riva"] = riva_module
-        importlib.sys.modules["riva.client"] = client_module
-
-    if "sounddevice" not in importlib.sys.modules:
-        sd_module = types.ModuleType("sounddevice")
-        sd_module.InputStream = object
-        importlib.sys.modules["sounddevice"] = sd_module
-
-    if "dotenv" not in importlib.sys.modules:
-        dotenv_module = types.ModuleType("dotenv")
-        dotenv_module.load_dotenv = lambda: None
-        importlib.sys.modules["dotenv"] = dotenv_module
-
-    if "pynput.keyboard" not in importlib.sys.modules:
-        pynput_module = types.ModuleType("pynput")
-        keyboard_module = types.ModuleType("pynput.keyboard")
-        keyboard_module.Controller = object
-        keyboard_module.Listener = object
-        keyboard_module.Key = types.SimpleNamespace(
-            esc="esc",
-            ctrl="ctrl",
-            ctrl_l="ctrl_l",
-            ctrl_r="ctrl_r",
-            left="left",
-            right="right",
-            shift="shift",
-            shift_l="shift_l",
-            shift_r="shift_r",
-        )
-        keyboard_module.KeyCode = object
-        pynput_module.keyboard = keyboard_module
-        importlib.sys.modules["pynput"] = pynput_module
-        importlib.sys.modules["pynput.keyboard"] = keyboard_module
-
-
-_install_dependency_stubs()
-cli_module = importlib.import_module("whispertocode.cli")
 config_store = importlib.import_module("whispertocode.config_store")
 onboarding_module = importlib.import_module("whispertocode.onboarding")
 
 
+class _FakeSpinBox:
+    # Mirrors Qt's behaviour of clamping setValue() to the current range.
+    def __init__(self) -> None:
+        self._range = (0, 99)
+        self._value = 0
+
+    def setRange(self, minimum, maximum) -> None:
+        self._range = (minimum, maximum)
+
+    def setSingleStep(self, _step) -> None:
+        pass
+
+    def setValue(self, value) -> None:
+        self._value = max(self._range[0], min(value, self._range[1]))
+
+    def value(self):
+        return self._value
+
+
+class _FakeDoubleSpinBox(_FakeSpinBox):
+    # QDoubleSpinBox also rounds values to the configured decimals.
+    def __init__(self) -> None:
+        super().__init__()
+        self._decimals = 2
+
+    def setDecimals(self, decimals: int) -> None:
+        self._decimals = decimals
+
+    def setValue(self, value) -> None:
+        super().setValue(round(value, self._decimals))
+
+
+class _FakeCheckBox:
+    def __init__(self, *_args) -> None:
+        self._checked = False
+
+    def setChecked(self, checked: bool) -> None:
+        self._checked = checked
+
+    def isChecked(self) -> bool:
+        return self._checked
+
+
+def _fake_qt_widgets() -> mock.MagicMock:
+    qt_widgets = mock.MagicMock()
+    qt_widgets.QLineEdit.side_effect = lambda text="": mock.Mock(**{"text.return_value": text})
+    qt_widgets.QSpinBox.side_effect = _FakeSpinBox
+    qt_widgets.QDoubleSpinBox.side_effect = _FakeDoubleSpinBox
+    qt_widgets.QCheckBox.side_effect = _FakeCheckBox
+    return qt_widgets
+
+
 class ConfigAndOnboardingFlowTests(unittest.TestCase):
     def test_parse_args_accepts_onboarding_flag(self):
         args = cli_module.parse_args(["--onboarding"])
@@ -63,6 +72,7 @@ class ConfigAndOnboardingFlowTests(unittest.TestCase):
     def test_main_runs_onboarding_when_key_missing(self):
         args = types.SimpleNamespace(
             sample_rate=16000,
+            audio_blocksize=256,
             language="auto",
             hold_delay=0.5,
             mode="raw",
@@ -93,6 +103,7 @@ class ConfigAndOnboardingFlowTests(unittest.TestCase):
     def test_main_returns_error_when_onboarding_canceled(self):
         args = types.SimpleNamespace(
             sample_rate=16000,
+            audio_blocksize=256,
             language="auto",
             hold_delay=0.5,
             mode="raw",
@@ -118,6 +129,7 @@ class ConfigAndOnboardingFlowTests(unittest.TestCase):
     def test_main_auto_migrates_env_setup_to_json_when_missing_config(self):
         args = types.SimpleNamespace(
             sample_rate=16000,
+            audio_blocksize=256,
             language="auto",
             hold_delay=0.5,
             mode="raw",
@@ -160,11 +172,77 @@ class ConfigAndOnboardingFlowTests(unittest.TestCase):
         self.assertEqual(resolved.nemotron_model, "config-model")
         self.assertFalse(resolved.nemotron_enable_thinking)
 
+    def test_resolve_settings_caps_reasoning_budget(self):
+        resolved = config_store.resolve_settings(
+            {"nemotron_reasoning_budget": 999999},
+            {"NEMOTRON_REASONING_PRINT_LIMIT": "-5"},
+        )
+        self.assertEqual(
+            resolved.nemotron_reasoning_budget, config_store.NEMOTRON_REASONING_BUDGET_MAX
+        )
+        self.assertEqual(resolved.nemotron_reasoning_print_limit, 0)
+
+    def test_nemotron_settings_clamps_and_is_cached(self):
+        settings = config_store.AppSettings(
+            nemotron_model="  model  ",
+            nemotron_reasoning_budget=999999,
+            nemotron_reasoning_print_limit=-5,
+        )
+        nemotron = config_store.nemotron_settings(settings)
+        self.assertEqual(nemotron.model, "model")
+        self.assertEqual(nemotron.reasoning_budget, config_store.NEMOTRON_REASONING_BUDGET_MAX)
+        self.assertEqual(nemotron.reasoning_print_limit, 0)
+        self.assertIs(config_store.nemotron_settings(settings), nemotron)
+
+    def test_resolve_settings_cached_reuses_result_until_saved(self):
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            mock.patch.object(config_store, "_settings_cache", (0.0, None)),
+            mock.patch("whispertocode.config_store.load_config_json", return_value={}) as load_mock,
+            mock.patch("whispertocode.config_store.load_env_fallback", return_value={}),
+            mock.patch("whispertocode.config_store.get_config_path", return_value=Path(tmp) / "config.json"),
+        ):
+            first = config_store.resolve_settings_cached()
+            self.assertIs(config_store.resolve_settings_cached(), first)
+            config_store.save_config_json(first)
+            config_store.resolve_settings_cached()
+        self.assertEqual(load_mock.call_count, 2)
+
+    def test_load_config_json_reuses_parse_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "config.json"
+            with mock.patch("whispertocode.config_store.get_config_path", return_value=path):
+                config_store.save_config_json(config_store.AppSettings(nvidia_api_key="saved"))
+                with mock.patch("whispertocode.config_store.json.loads") as load_mock:
+                    data = config_store.load_config_json()
+                load_mock.assert_not_called()
+                self.assertEqual(data["nvidia_api_key"], "saved")
+                self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ["config.json"])
+
+                path.write_text('{"nvidia_api_key": "edited"}', encoding="utf-8")
+                os.utime(path, ns=(0, 1))
+                self.assertEqual(config_store.load_config_json(), {"nvidia_api_key": "edited"})
+
+    def test_load_env_fallback_snapshots_process_environment(self):
+        with (
+            mock.patch.object(config_store, "_env_snapshot", None),
+            mock.patch.dict(os.environ, {"NVIDIA_API_KEY": " first "}),
+        ):
+            self.assertEqual(config_store.load_env_fallback()["NVIDIA_API_KEY"], "first")
+            os.environ["NVIDIA_API_KEY"] = "second"
+            self.assertEqual(config_store.load_env_fallback()["NVIDIA_API_KEY"], "first")
+            self.assertEqual(
+                config_store.load_env_fallback({"NVIDIA_API_KEY": "explicit"}),
+                {"NVIDIA_API_KEY": "explicit"},
+            )
+
     def test_get_config_dir_windows_uses_appdata(self):
         with (
-            mock.patch("whispertocode.config_store.os.name", "nt"),
+            mock.patch.object(config_store, "_IS_WIN", True),
             mock.patch("whispertocode.config_store.os.getenv", side_effect=lambda key: "C:/Users/test/AppData/Roaming" if key == "APPDATA" else None),
         ):
+            config_store.get_config_dir.cache_clear()
+            self.addCleanup(config_store.get_config_dir.cache_clear)
             path = config_store.get_config_dir()
         self.assertEqual(path, Path("C:/Users/test/AppData/Roaming/WhisperToCode"))
 
@@ -186,6 +264,38 @@ class ConfigAndOnboardingFlowTests(unittest.TestCase):
         self.assertIsNone(result)
         fake_app.setQuitOnLastWindowClosed.assert_called_once_with(False)
 
+    def _build_wizard(self, initial):
+        qt_widgets = _fake_qt_widgets()
+        wizard = onboarding_module._OnboardingWizard(
+            mock.MagicMock(), mock.MagicMock(), qt_widgets, initial
+        )
+        wizard._customize_checkbox.setChecked(True)
+        return wizard, qt_widgets
+
+    def test_wizard_round_trips_non_default_nemotron_settings(self):
+        initial = config_store.AppSettings(
+            nvidia_api_key="nvapi-test",
+            riva_server="riva.example:443",
+            riva_function_id="fn-123",
+            nemotron_base_url="https://llm.example/v1",
+            nemotron_model="custom/model",
+            nemotron_temperature=2.5,
+            nemotron_top_p=0.955,
+            nemotron_max_tokens=2_000_000,
+            nemotron_reasoning_budget=1234,
+            nemotron_reasoning_print_limit=3999,
+            nemotron_enable_thinking=False,
+        )
+        wizard, _ = self._build_wizard(initial)
+        self.assertTrue(wizard._validate_nemotron_page())
+        self.assertEqual(wizard.collect_settings(), initial)
+
+    def test_wizard_rejects_out_of_range_top_p(self):
+        wizard, qt_widgets = self._build_wizard(config_store.AppSettings(nemotron_top_p=1.5))
+        self.assertFalse(wizard._validate_nemotron_page())
+        message = qt_widgets.QMessageBox.warning.call_args.args[2]
+        self.assertIn("NEMOTRON_TOP_P", message)
+
 
 if __name__ == "__main__":
     unittest.main()
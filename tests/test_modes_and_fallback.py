@@ -1,485 +1,641 @@
-import importlib
-import threading
 import types
-import unittest
 from unittest import mock
-import numpy as np
 
+import pytest
 
-def _install_dependency_stubs() -> None:
-    if "riva.client" not in importlib.sys.modules:
-        riva_module = types.ModuleType("riva")
-        client_module = types.ModuleType("riva.client")
+from conftest import (
+    audio_support,
+    cli_module,
+    hotkeys_support,
+    overlay_module,
+    ptt_whisper,
+    swap_attr,
+    tray_support,
+)
 
-        class DummyAuth:
-            def __init__(self, *args, **kwargs):
-                pass
-
-        class DummyASRService:
-            def __init__(self, *args, **kwargs):
-                pass
-
-        class DummyRecognitionConfig:
-            def __init__(self, *args, **kwargs):
-                pass
-
-        class DummyAudioEncoding:
-            LINEAR_PCM = "LINEAR_PCM"
-
-        client_module.Auth = DummyAuth
-        client_module.ASRService = DummyASRService
-        client_module.RecognitionConfig = DummyRecognitionConfig
-        client_module.AudioEncoding = DummyAudioEncoding
-        riva_module.client = client_module
-        importlib.sys.modules["riva"] = riva_module
-        importlib.sys.modules["riva.client"] = client_module
-
-    if "sounddevice" not in importlib.sys.modules:
-        sd_module = types.ModuleType("sounddevice")
-
-        class DummyInputStream:
-            def __init__(self, *args, **kwargs):
-                pass
-
-            def start(self):
-                pass
-
-            def stop(self):
-                pass
-
-            def close(self):
-                pass
-
-        sd_module.InputStream = DummyInputStream
-        importlib.sys.modules["sounddevice"] = sd_module
-
-    if "dotenv" not in importlib.sys.modules:
-        dotenv_module = types.ModuleType("dotenv")
-        dotenv_module.load_dotenv = lambda: None
-        importlib.sys.modules["dotenv"] = dotenv_module
-
-    if "pynput.keyboard" not in importlib.sys.modules:
-        pynput_module = types.ModuleType("pynput")
-        keyboard_module = types.ModuleType("pynput.keyboard")
-
-        class DummyController:
-            def type(self, text):
-                pass
-
-        class DummyListener:
-            def __init__(self, *args, **kwargs):
-                pass
-
-            def start(self):
-                pass
-
-            def stop(self):
-                pass
-
-            def join(self, timeout=None):
-                pass
-
-            def suppress_event(self):
-                pass
-
-        class DummyKey:
-            esc = "esc"
-            ctrl = "ctrl"
-            ctrl_l = "ctrl_l"
-            ctrl_r = "ctrl_r"
-            shift = "shift"
-            shift_l = "shift_l"
-            shift_r = "shift_r"
-            left = "left"
-            right = "right"
-
-        keyboard_module.Controller = DummyController
-        keyboard_module.Listener = DummyListener
-        keyboard_module.Key = DummyKey
-        keyboard_module.KeyCode = object
-        pynput_module.keyboard = keyboard_module
-        importlib.sys.modules["pynput"] = pynput_module
-        importlib.sys.modules["pynput.keyboard"] = keyboard_module
-
-
-_install_dependency_stubs()
-ptt_whisper = importlib.import_module("whispertocode.app")
-cli_module = importlib.import_module("whispertocode.cli")
-overlay_module = importlib.import_module("whispertocode.overlay")
-
-
-def _make_app() -> "ptt_whisper.HoldToTalkRiva":
-    app = object.__new__(ptt_whisper.HoldToTalkRiva)
-    app._lock = threading.Lock()
-    app._stop_event = threading.Event()
-    app._settings_request_event = threading.Event()
-    app._settings_request_source = ""
-    app._output_mode = ptt_whisper.OUTPUT_MODE_RAW
-    app._keyboard = mock.Mock()
-    app._peak_level = 0.05
-    app._min_level = 0.01
-    app._level_ema = 0.02
+
+class _FakeOverlay:
+    def __init__(self, **results) -> None:
+        self.calls = []
+        self._results = results
+
+    def __getattr__(self, name):
+        def _record(*args, **kwargs):
+            self.calls.append((name, args))
+            return self._results.get(name)
+
+        return _record
+
+
+def _overlay_levels(overlay: _FakeOverlay) -> list:
+    return [args[0] for name, args in overlay.calls if name == "update_level"]
+
+
+def _drain_level_worker(app) -> None:
+    app._stop_level_worker()
+    audio_support.level_worker_loop(app)
+
+
+@pytest.fixture
+def app_with_overlay(app):
+    app._overlay_controller = _FakeOverlay()
     return app
 
 
-class ModesAndFallbackTests(unittest.TestCase):
-    def test_parse_args_default_mode_is_raw(self):
-        args = cli_module.parse_args([])
-        self.assertEqual(args.mode, ptt_whisper.OUTPUT_MODE_RAW)
-
-    def test_parse_args_accepts_smart_mode(self):
-        args = cli_module.parse_args(["--mode", ptt_whisper.OUTPUT_MODE_SMART])
-        self.assertEqual(args.mode, ptt_whisper.OUTPUT_MODE_SMART)
-
-    def test_parse_args_defaults_to_tray_without_debug_console(self):
-        args = cli_module.parse_args([])
-        self.assertFalse(args.no_tray)
-        self.assertFalse(args.debug_console)
-
-    def test_parse_args_can_disable_tray_and_enable_debug_console(self):
-        args = cli_module.parse_args(["--no-tray", "--debug-console"])
-        self.assertTrue(args.no_tray)
-        self.assertTrue(args.debug_console)
-
-    def test_local_special_keys_switch_modes(self):
-        app = _make_app()
-        with mock.patch("builtins.print"):
-            handled_right = app._handle_local_special_key("M")
-            handled_left = app._handle_local_special_key("K")
-        self.assertTrue(handled_right)
-        self.assertTrue(handled_left)
-        self.assertEqual(app._get_output_mode(), ptt_whisper.OUTPUT_MODE_RAW)
-
-    def test_local_special_key_ignores_unknown_key(self):
-        app = _make_app()
-        handled = app._handle_local_special_key("H")
-        self.assertFalse(handled)
-        self.assertEqual(app._get_output_mode(), ptt_whisper.OUTPUT_MODE_RAW)
-
-    def test_local_escape_requests_shutdown(self):
-        app = _make_app()
-        app.request_shutdown = mock.Mock()
-        handled = app._handle_local_console_char("\x1b")
-        self.assertTrue(handled)
-        app.request_shutdown.assert_called_once_with("Esc")
-
-    def test_startup_banner_windows_mentions_local_hotkeys(self):
-        app = _make_app()
-        app.hold_delay_sec = 0.5
-        with mock.patch("whispertocode.app.os.name", "nt"):
-            lines = app._startup_banner_lines()
-        self.assertIn("Current mode: RAW", lines)
-        self.assertTrue(
-            any("Local hotkeys:" in line and "enabled in this console window" in line for line in lines)
-        )
+@pytest.fixture
+def recording_app(app_with_overlay, np):
+    app_with_overlay._recording = True
+    app_with_overlay._capture_buf = np.empty(1024, dtype=np.int16)
+    return app_with_overlay
 
-    def test_startup_banner_mentions_shift_for_recording(self):
-        app = _make_app()
-        app.hold_delay_sec = 0.5
-        app._tray_enabled = False
-        with mock.patch("whispertocode.app.os.name", "nt"):
-            lines = app._startup_banner_lines()
-        self.assertIn("Hold Shift for at least 0.5s to record, release Shift to transcribe and type.", lines)
-
-    def test_startup_banner_non_windows_reports_unavailable_hotkeys(self):
-        app = _make_app()
-        app.hold_delay_sec = 0.5
-        app._tray_enabled = False
-        with mock.patch("whispertocode.app.os.name", "posix"):
-            lines = app._startup_banner_lines()
-        self.assertTrue(any("Local hotkeys: unavailable on this OS" in line for line in lines))
-
-    def test_shift_press_starts_hold_timer(self):
-        app = _make_app()
-        app.hold_delay_sec = 0.5
-        app._ctrl_count = 0
-        app._press_token = 0
-        app._hold_timer = None
-        timer = mock.Mock()
-        with mock.patch("whispertocode.app.threading.Timer", return_value=timer):
-            app._on_press(ptt_whisper.keyboard.Key.shift)
-        self.assertEqual(app._ctrl_count, 1)
-        self.assertEqual(app._press_token, 1)
-        self.assertIs(app._hold_timer, timer)
-        timer.start.assert_called_once()
-
-    def test_startup_banner_in_tray_mode_mentions_tray_controls(self):
-        app = _make_app()
-        app.hold_delay_sec = 0.5
-        app._tray_enabled = True
-        lines = app._startup_banner_lines()
-        self.assertTrue(any("Tray controls:" in line for line in lines))
-
-    def test_tray_console_toggle_delegates_to_console_visibility_handler(self):
-        app = _make_app()
-        app._set_console_visibility = mock.Mock()
-        app._handle_tray_show_console(None, None)
-        app._set_console_visibility.assert_called_once_with(True, "tray")
-        app._set_console_visibility.reset_mock()
-        app._handle_tray_hide_console(None, None)
-        app._set_console_visibility.assert_called_once_with(False, "tray")
-
-    def test_tray_settings_delegates_to_settings_request(self):
-        app = _make_app()
-        app._request_open_settings = mock.Mock()
-        app._handle_tray_open_settings(None, None)
-        app._request_open_settings.assert_called_once_with("tray")
-
-    def test_process_pending_settings_request_uses_overlay_qt_thread(self):
-        app = _make_app()
-        app._settings_request_event.set()
-        app._settings_request_source = "tray"
-        app._overlay_controller = mock.Mock()
-        app._notify_tray_unavailable = mock.Mock()
-
-        updated_settings = types.SimpleNamespace()
-        app._overlay_controller.run_onboarding_dialog.return_value = updated_settings
-        with (
-            mock.patch("whispertocode.app.load_config_json", return_value={}),
-            mock.patch("whispertocode.app.load_env_fallback", return_value={}),
-            mock.patch("whispertocode.app.resolve_settings", return_value=types.SimpleNamespace()),
-            mock.patch("whispertocode.app.run_onboarding") as run_onboarding_mock,
-            mock.patch("whispertocode.app.save_config_json") as save_mock,
-            mock.patch("builtins.print"),
-        ):
-            app._process_pending_settings_request()
-
-        run_onboarding_mock.assert_not_called()
-        app._overlay_controller.run_onboarding_dialog.assert_called_once()
-        save_mock.assert_called_once_with(updated_settings)
-        app._notify_tray_unavailable.assert_called_once()
-
-    def test_set_output_mode_updates_overlay_mode(self):
-        app = _make_app()
-        app._overlay_controller = mock.Mock()
-        with mock.patch("builtins.print"):
-            app._set_output_mode(ptt_whisper.OUTPUT_MODE_SMART, "test")
-        app._overlay_controller.set_mode.assert_called_once_with(ptt_whisper.OUTPUT_MODE_SMART)
-
-    def test_audio_callback_updates_overlay_level_while_recording(self):
-        app = _make_app()
-        app._recording = True
-        app._chunks = []
-        app._overlay_controller = mock.Mock()
-        frame = np.array([[0.5], [-0.5], [0.25], [-0.25]], dtype=np.float32)
-        app._audio_callback(frame, frames=4, time_info=None, status=None)
-        self.assertEqual(len(app._chunks), 1)
-        app._overlay_controller.update_level.assert_called_once()
-        level_value = app._overlay_controller.update_level.call_args.args[0]
-        self.assertGreater(level_value, 0.0)
-
-    def test_audio_callback_keeps_headroom_for_loud_voice(self):
-        app = _make_app()
-        app._recording = True
-        app._chunks = []
-        app._overlay_controller = mock.Mock()
-
-        loud_frame = np.array([[0.6], [-0.6], [0.6], [-0.6]], dtype=np.float32)
-        medium_frame = np.array([[0.3], [-0.3], [0.3], [-0.3]], dtype=np.float32)
-
-        app._audio_callback(loud_frame, frames=4, time_info=None, status=None)
-        first_level = app._overlay_controller.update_level.call_args.args[0]
-        app._audio_callback(medium_frame, frames=4, time_info=None, status=None)
-        second_level = app._overlay_controller.update_level.call_args.args[0]
-
-        self.assertLess(first_level, 1.0)
-        self.assertGreater(first_level, 0.0)
-        self.assertGreater(second_level, 0.0)
-        self.assertLess(second_level, first_level)
-
-    def test_audio_callback_adapts_for_very_quiet_microphone(self):
-        app = _make_app()
-        app._recording = True
-        app._chunks = []
-        app._overlay_controller = mock.Mock()
-
-        quiet_frame = np.array([[0.004], [-0.004], [0.004], [-0.004]], dtype=np.float32)
-        for _ in range(140):
-            app._audio_callback(quiet_frame, frames=4, time_info=None, status=None)
-
-        level_value = app._overlay_controller.update_level.call_args.args[0]
-        self.assertGreater(level_value, 0.3)
-        self.assertLessEqual(level_value, 1.0)
-
-    def test_start_recording_shows_overlay(self):
-        app = _make_app()
-        app._overlay_controller = mock.Mock()
-        app._recording = False
-        app._transcribing = False
-        app._chunks = []
-        app.sample_rate = 16000
-        stream = mock.Mock()
-        with (
-            mock.patch("whispertocode.app.sd.InputStream", return_value=stream),
-            mock.patch("builtins.print"),
-        ):
-            app._start_recording()
-        app._overlay_controller.show_recording.assert_called_once_with(ptt_whisper.OUTPUT_MODE_RAW)
-
-    def test_stop_recording_hides_overlay(self):
-        app = _make_app()
-        app._overlay_controller = mock.Mock()
-        app._recording = True
-        app._chunks = []
-        app._stream = None
-        with mock.patch("builtins.print"):
-            app._stop_recording()
-        app._overlay_controller.hide.assert_called_once()
-
-    def test_start_overlay_initialization_failure_raises_runtime_error(self):
-        app = _make_app()
-        app._overlay_controller = None
-        app._create_overlay_controller = mock.Mock(side_effect=RuntimeError("boom"))
-        with self.assertRaises(RuntimeError):
-            app._start_overlay()
-
-    def test_start_overlay_initialization_success_stores_controller(self):
-        app = _make_app()
-        app._overlay_controller = None
-        controller = mock.Mock()
-        app._create_overlay_controller = mock.Mock(return_value=controller)
-        app._start_overlay()
-        controller.start.assert_called_once()
-        self.assertIs(app._overlay_controller, controller)
 
-    def test_set_console_visibility_allocates_console_if_missing(self):
-        app = _make_app()
-        app._debug_console = False
-        app._refresh_tray_menu = mock.Mock()
-        app._redirect_stdio_to_console = mock.Mock()
-        app._console_visible = False
+@pytest.fixture(scope="session")
+def audio_frames(np):
+    def _frozen(*samples: float):
+        frame = np.array([[round(sample * 32767)] for sample in samples], dtype=np.int16)
+        frame.setflags(write=False)
+        return frame
 
-        state = {"hwnd": 0}
+    return types.SimpleNamespace(
+        mixed=_frozen(0.5, -0.5, 0.25, -0.25),
+        loud=_frozen(0.6, -0.6, 0.6, -0.6),
+        medium=_frozen(0.3, -0.3, 0.3, -0.3),
+        quiet=_frozen(0.004, -0.004, 0.004, -0.004),
+    )
 
-        def _get_console_window():
-            return state["hwnd"]
 
-        def _alloc_console():
-            state["hwnd"] = 101
-            return 1
+@pytest.mark.parametrize(
+    ("argv", "expected"),
+    [
+        ([], {"mode": ptt_whisper.OUTPUT_MODE_RAW, "no_tray": False, "debug_console": False}),
+        (["--mode", ptt_whisper.OUTPUT_MODE_SMART], {"mode": ptt_whisper.OUTPUT_MODE_SMART}),
+        (["--no-tray", "--debug-console"], {"no_tray": True, "debug_console": True}),
+        (["--audio-blocksize", "512"], {"audio_blocksize": 512}),
+    ],
+)
+def test_parse_args(argv, expected):
+    args = cli_module.parse_args(argv)
+    for name, value in expected.items():
+        assert getattr(args, name) == value
 
-        kernel32 = types.SimpleNamespace(
-            GetConsoleWindow=mock.Mock(side_effect=_get_console_window),
-            AllocConsole=mock.Mock(side_effect=_alloc_console),
-        )
-        user32 = types.SimpleNamespace(ShowWindow=mock.Mock(return_value=1))
-        fake_ctypes = types.SimpleNamespace(
-            windll=types.SimpleNamespace(kernel32=kernel32, user32=user32)
-        )
 
-        with (
-            mock.patch("whispertocode.app.os.name", "nt"),
-            mock.patch("whispertocode.tray_support.os.name", "nt"),
-            mock.patch.dict(importlib.sys.modules, {"ctypes": fake_ctypes}),
-            mock.patch("builtins.print"),
-        ):
-            result = app._set_console_visibility(True, "tray")
-
-        self.assertTrue(result)
-        kernel32.AllocConsole.assert_called_once()
-        app._redirect_stdio_to_console.assert_called_once()
-        user32.ShowWindow.assert_called_once_with(101, ptt_whisper.WINDOWS_SW_SHOW)
-
-    def test_smart_failure_without_output_falls_back_to_raw(self):
-        app = _make_app()
-        app._rewrite_text_streaming = mock.Mock(
-            return_value=(False, RuntimeError("nemotron timeout"))
-        )
-        with mock.patch("builtins.print"):
-            app._type_output_text("raw text", ptt_whisper.OUTPUT_MODE_SMART)
-        app._keyboard.type.assert_called_once_with("raw text")
-
-    def test_smart_failure_after_partial_output_does_not_append_raw(self):
-        app = _make_app()
-        app._rewrite_text_streaming = mock.Mock(
-            return_value=(True, RuntimeError("stream interrupted"))
-        )
-        with mock.patch("builtins.print"):
-            app._type_output_text("raw text", ptt_whisper.OUTPUT_MODE_SMART)
-        app._keyboard.type.assert_not_called()
-
-    def test_main_returns_error_when_run_raises_runtime_error(self):
-        args = types.SimpleNamespace(
-            sample_rate=16000,
-            language="auto",
-            hold_delay=0.5,
-            mode=ptt_whisper.OUTPUT_MODE_RAW,
-            no_tray=False,
-            debug_console=False,
-            onboarding=False,
-        )
-        app = mock.Mock()
-        app.run.side_effect = RuntimeError("overlay failed")
-        with (
-            mock.patch("whispertocode.cli.parse_args", return_value=args),
-            mock.patch(
-                "whispertocode.cli.get_config_path",
-                return_value=types.SimpleNamespace(exists=lambda: True),
-            ),
-            mock.patch(
-                "whispertocode.cli.resolve_settings",
-                return_value=types.SimpleNamespace(
-                    nvidia_api_key="key",
-                    riva_server="grpc.nvcf.nvidia.com:443",
-                    riva_function_id="b702f636-f60c-4a3d-a6f4-f3568c13bd7d",
-                    nemotron_base_url="https://integrate.api.nvidia.com/v1",
-                    nemotron_model="nvidia/nemotron-3-nano-30b-a3b",
-                    nemotron_temperature=1.0,
-                    nemotron_top_p=1.0,
-                    nemotron_max_tokens=16384,
-                    nemotron_reasoning_budget=4096,
-                    nemotron_reasoning_print_limit=600,
-                    nemotron_enable_thinking=True,
-                ),
-            ),
-            mock.patch("whispertocode.cli.load_config_json", return_value={}),
-            mock.patch("whispertocode.cli.load_env_fallback", return_value={}),
-            mock.patch("whispertocode.cli.HoldToTalkRiva", return_value=app),
-            mock.patch("whispertocode.cli.signal.signal"),
-            mock.patch("builtins.print"),
-        ):
-            code = cli_module.main()
-        self.assertEqual(code, 1)
-
-
-class OverlayPlacementTests(unittest.TestCase):
-    def test_capsule_places_bottom_center(self):
-        geometry = types.SimpleNamespace(
-            x=lambda: 100,
-            y=lambda: 50,
-            width=lambda: 800,
-            height=lambda: 600,
-        )
-        screen = types.SimpleNamespace(availableGeometry=lambda: geometry)
-        qt_gui = types.SimpleNamespace(
-            QGuiApplication=types.SimpleNamespace(primaryScreen=lambda: screen)
+def test_local_special_keys_switch_modes(app):
+    handled_right = app._handle_local_special_key("M")
+    handled_left = app._handle_local_special_key("K")
+    assert handled_right
+    assert handled_left
+    assert app._get_output_mode() == ptt_whisper.OUTPUT_MODE_RAW
+
+
+def test_local_special_key_ignores_unknown_key(app):
+    handled = app._handle_local_special_key("H")
+    assert not handled
+    assert app._get_output_mode() == ptt_whisper.OUTPUT_MODE_RAW
+
+
+def test_local_escape_requests_shutdown(app):
+    app.request_shutdown = mock.Mock()
+    handled = app._handle_local_console_char("\x1b")
+    assert handled
+    app.request_shutdown.assert_called_once_with("Esc")
+
+
+def test_local_hotkeys_discards_non_key_console_records(app):
+    console = mock.Mock()
+    console.wait.return_value = True
+    console.queued.return_value = 3
+
+    def _kbhit():
+        app._stop_event.set()
+        return False
+
+    msvcrt = types.SimpleNamespace(kbhit=_kbhit)
+    with (
+        mock.patch.dict("sys.modules", {"msvcrt": msvcrt}),
+        swap_attr(tray_support, "_console_input", lambda: console),
+        mock.patch.object(tray_support.time, "sleep") as sleep,
+    ):
+        tray_support.local_hotkeys_loop(app)
+
+    console.discard.assert_called_once_with(3)
+    sleep.assert_not_called()
+
+
+def test_local_hotkeys_sleeps_when_signaled_console_has_nothing_queued(app):
+    console = mock.Mock()
+    console.wait.return_value = True
+    console.queued.return_value = 0
+
+    def _kbhit():
+        app._stop_event.set()
+        return False
+
+    msvcrt = types.SimpleNamespace(kbhit=_kbhit)
+    with (
+        mock.patch.dict("sys.modules", {"msvcrt": msvcrt}),
+        swap_attr(tray_support, "_console_input", lambda: console),
+        mock.patch.object(tray_support.time, "sleep") as sleep,
+    ):
+        tray_support.local_hotkeys_loop(app)
+
+    console.discard.assert_not_called()
+    sleep.assert_called_once_with(0.03)
+
+
+def test_request_shutdown_wakes_main_loop(app):
+    app.request_shutdown("test")
+    assert app._stop_event.is_set()
+    assert app._settings_request_event.is_set()
+
+
+def test_startup_banner_windows_mentions_local_hotkeys(app):
+    with swap_attr(ptt_whisper.os, "name", "nt"):
+        lines = app._startup_banner_lines()
+    assert "Current mode: RAW" in lines
+    assert any(
+        "Local hotkeys:" in line and "enabled in this console window" in line for line in lines
+    )
+
+
+def test_startup_banner_mentions_shift_for_recording(app):
+    with swap_attr(ptt_whisper.os, "name", "nt"):
+        lines = app._startup_banner_lines()
+    assert "Hold Shift for at least 0.5s to record, release Shift to transcribe and type." in lines
+
+
+def test_startup_banner_non_windows_reports_unavailable_hotkeys(app):
+    with swap_attr(ptt_whisper.os, "name", "posix"):
+        lines = app._startup_banner_lines()
+    assert any("Local hotkeys: unavailable on this OS" in line for line in lines)
+
+
+def test_shift_press_queues_hold_request(app):
+    worker = mock.Mock()
+    with mock.patch("whispertocode.app.threading.Thread", return_value=worker):
+        app._on_press(ptt_whisper.keyboard.Key.shift)
+    assert app._ctrl_count == 1
+    assert app._press_token == 1
+    assert app._hold_thread is worker
+    worker.start.assert_called_once()
+    token, cancel = app._hold_requests.get_nowait()
+    assert token == 1
+    assert cancel is app._hold_cancel
+
+
+def test_hold_delay_loop_starts_recording_unless_cancelled(app):
+    started = []
+    app.hold_delay_sec = 0.0
+    app._start_recording_if_valid = started.append
+    app._hold_requests.put((1, ptt_whisper.threading.Event()))
+    app._hold_requests.put(None)
+    hotkeys_support.hold_delay_loop(app)
+    assert started == [1]
+
+    app.hold_delay_sec = 5.0
+    cancelled = ptt_whisper.threading.Event()
+    cancelled.set()
+    app._hold_requests.put((2, cancelled))
+    app._hold_requests.put(None)
+    hotkeys_support.hold_delay_loop(app)
+    assert started == [1]
+
+
+def test_startup_banner_in_tray_mode_mentions_tray_controls(app):
+    app._tray_enabled = True
+    lines = app._startup_banner_lines()
+    assert any("Tray controls:" in line for line in lines)
+
+
+def test_tray_console_toggle_delegates_to_console_visibility_handler(app):
+    app._set_console_visibility = mock.Mock()
+    app._handle_tray_show_console(None, None)
+    app._set_console_visibility.assert_called_once_with(True, "tray")
+    app._set_console_visibility.reset_mock()
+    app._handle_tray_hide_console(None, None)
+    app._set_console_visibility.assert_called_once_with(False, "tray")
+
+
+def test_tray_settings_delegates_to_settings_request(app):
+    app._request_open_settings = mock.Mock()
+    app._handle_tray_open_settings(None, None)
+    app._request_open_settings.assert_called_once_with("tray")
+
+
+def test_process_pending_settings_request_uses_overlay_qt_thread(app):
+    app._settings_request_event.set()
+    app._settings_request_source = "tray"
+    app._notify_tray_unavailable = mock.Mock()
+
+    updated_settings = types.SimpleNamespace()
+    app._overlay_controller = _FakeOverlay(run_onboarding_dialog=updated_settings)
+    with (
+        mock.patch("whispertocode.app.resolve_settings_cached", return_value=types.SimpleNamespace()),
+        mock.patch("whispertocode.app.run_onboarding") as run_onboarding_mock,
+        mock.patch("whispertocode.app.save_config_json") as save_mock,
+    ):
+        app._process_pending_settings_request()
+
+    run_onboarding_mock.assert_not_called()
+    assert [name for name, _ in app._overlay_controller.calls] == ["run_onboarding_dialog"]
+    save_mock.assert_called_once_with(updated_settings)
+    app._notify_tray_unavailable.assert_called_once()
+
+
+def test_set_output_mode_updates_overlay_mode(app_with_overlay):
+    app_with_overlay._set_output_mode(ptt_whisper.OUTPUT_MODE_SMART, "test")
+    assert app_with_overlay._overlay_controller.calls == [
+        ("set_mode", (ptt_whisper.OUTPUT_MODE_SMART,))
+    ]
+
+
+def test_audio_callback_updates_overlay_level_while_recording(recording_app, audio_frames):
+    recording_app._audio_callback(audio_frames.mixed, frames=4, time_info=None, status=None)
+    assert recording_app._capture_len == 4
+    assert _overlay_levels(recording_app._overlay_controller) == []
+    _drain_level_worker(recording_app)
+    levels = _overlay_levels(recording_app._overlay_controller)
+    assert len(levels) == 1
+    assert levels[0] > 0.0
+
+
+def test_audio_callback_stops_capturing_at_buffer_capacity(recording_app, np, audio_frames):
+    recording_app._capture_buf = np.zeros(6, dtype=np.int16)
+    recording_app._capture_buf[:3] = [1, 2, 3]
+    recording_app._capture_len = 3
+    recording_app._audio_callback(audio_frames.mixed, frames=4, time_info=None, status=None)
+    recording_app._audio_callback(audio_frames.mixed, frames=4, time_info=None, status=None)
+    assert recording_app._capture_len == 6
+    assert recording_app._capture_buf.tolist() == [1, 2, 3, 16384, -16384, 8192]
+    assert list(recording_app._level_blocks) == [(3, 6)]
+    assert len(recording_app._audio_log) == 1
+
+
+def test_level_worker_skips_imperceptible_level_changes(recording_app, np):
+    silence = np.zeros((4, 1), dtype=np.int16)
+    for _ in range(3):
+        recording_app._audio_callback(silence, frames=4, time_info=None, status=None)
+    _drain_level_worker(recording_app)
+    assert _overlay_levels(recording_app._overlay_controller) == [0.0]
+
+
+def test_compute_level_on_silence_decays_peak_and_reports_zero(np):
+    silence = np.zeros(4, dtype=np.int16)
+    level, level_ema, peak_level = audio_support._compute_level(
+        silence, level_ema=0.02, peak_level=0.5, min_level=0.01
+    )
+    assert level == 0.0
+    assert level_ema == pytest.approx(0.02 * 0.92)
+    assert peak_level == pytest.approx(0.5 * 0.997)
+
+
+def test_audio_callback_keeps_headroom_for_loud_voice(recording_app, audio_frames):
+    recording_app._audio_callback(audio_frames.loud, frames=4, time_info=None, status=None)
+    recording_app._audio_callback(audio_frames.medium, frames=4, time_info=None, status=None)
+    _drain_level_worker(recording_app)
+    first_level, second_level = _overlay_levels(recording_app._overlay_controller)
+
+    assert first_level < 1.0
+    assert first_level > 0.0
+    assert second_level > 0.0
+    assert second_level < first_level
+
+
+def test_audio_callback_adapts_for_very_quiet_microphone(recording_app, audio_frames):
+    for _ in range(140):
+        recording_app._audio_callback(
+            audio_frames.quiet, frames=4, time_info=None, status=None
         )
-        widget = mock.Mock()
-        widget.width.return_value = 150
-        widget.height.return_value = 100
+    _drain_level_worker(recording_app)
+
+    level_value = _overlay_levels(recording_app._overlay_controller)[-1]
+    assert level_value > 0.3
+    assert level_value <= 1.0
 
-        overlay = object.__new__(overlay_module._CapsuleOverlayWidget)
-        overlay._qt_gui = qt_gui
-        overlay._widget = widget
-        overlay._target_opacity = 1.0
-        overlay._current_opacity = 1.0
 
-        overlay._place_bottom_center()
+def test_start_recording_shows_overlay(app_with_overlay):
+    stream = mock.Mock()
+    with mock.patch("whispertocode.app.sd.InputStream", return_value=stream):
+        app_with_overlay._start_recording()
+    calls = app_with_overlay._overlay_controller.calls
+    assert ("show_recording", (ptt_whisper.OUTPUT_MODE_RAW,)) in calls
 
-        widget.move.assert_called_once_with(425, 530)
 
-    def test_bar_position_gain_prefers_center_and_is_symmetric(self):
-        count = 20
-        center_left = overlay_module._CapsuleOverlayWidget._bar_position_gain(9, count)
-        center_right = overlay_module._CapsuleOverlayWidget._bar_position_gain(10, count)
-        edge_left = overlay_module._CapsuleOverlayWidget._bar_position_gain(0, count)
-        edge_right = overlay_module._CapsuleOverlayWidget._bar_position_gain(19, count)
+def test_stop_recording_hides_overlay(app_with_overlay):
+    app_with_overlay._recording = True
+    app_with_overlay._stop_recording()
+    assert ("hide", ()) in app_with_overlay._overlay_controller.calls
 
-        self.assertGreater(center_left, edge_left)
-        self.assertGreater(center_right, edge_right)
-        self.assertAlmostEqual(center_left, center_right, places=6)
-        self.assertAlmostEqual(edge_left, edge_right, places=6)
 
+def test_stop_recording_skips_silent_clip(recording_app, np):
+    recording_app._capture_buf = np.full(4000, 10, dtype=np.int16)
+    recording_app._capture_len = 4000
+    recording_app._transcribe_and_type = mock.Mock()
+    recording_app._stop_recording()
+    recording_app._transcribe_and_type.assert_not_called()
 
-if __name__ == "__main__":
-    unittest.main()
+
+def test_start_overlay_initialization_failure_raises_runtime_error(app):
+    app._create_overlay_controller = mock.Mock(side_effect=RuntimeError("boom"))
+    with pytest.raises(RuntimeError):
+        app._start_overlay()
+
+
+def test_start_overlay_initialization_success_stores_controller(app):
+    controller = _FakeOverlay()
+    app._create_overlay_controller = lambda: controller
+    app._start_overlay()
+    assert [name for name, _ in controller.calls] == ["start", "set_mode"]
+    assert app._overlay_controller is controller
+
+
+def test_set_console_visibility_allocates_console_if_missing(app):
+    app._refresh_tray_menu = mock.Mock()
+    app._redirect_stdio_to_console = mock.Mock()
+
+    state = {"hwnd": 0}
+    calls = {"alloc": 0, "show": None}
+
+    def _alloc_console():
+        calls["alloc"] += 1
+        state["hwnd"] = 101
+        return 1
+
+    def _show_window(hwnd, command):
+        calls["show"] = (hwnd, command)
+        return 1
+
+    kernel32 = types.SimpleNamespace(
+        GetConsoleWindow=lambda: state["hwnd"],
+        AllocConsole=_alloc_console,
+    )
+    user32 = types.SimpleNamespace(ShowWindow=_show_window)
+    fake_ctypes = types.SimpleNamespace(
+        windll=types.SimpleNamespace(kernel32=kernel32, user32=user32)
+    )
+
+    with (
+        swap_attr(ptt_whisper.os, "name", "nt"),
+        swap_attr(tray_support, "ctypes", fake_ctypes),
+    ):
+        result = app._set_console_visibility(True, "tray")
+
+    assert result
+    assert calls["alloc"] == 1
+    app._redirect_stdio_to_console.assert_called_once()
+    assert calls["show"] == (101, ptt_whisper.WINDOWS_SW_SHOW)
+
+
+def test_smart_failure_without_output_falls_back_to_raw(app):
+    app._rewrite_text_streaming = mock.Mock(
+        return_value=(False, RuntimeError("nemotron timeout"))
+    )
+    app._type_output_text("raw text", ptt_whisper.OUTPUT_MODE_SMART)
+    assert app._keyboard.typed == ["raw text"]
+
+
+def test_smart_failure_after_partial_output_does_not_append_raw(app):
+    app._rewrite_text_streaming = mock.Mock(
+        return_value=(True, RuntimeError("stream interrupted"))
+    )
+    app._type_output_text("raw text", ptt_whisper.OUTPUT_MODE_SMART)
+    assert app._keyboard.typed == []
+
+
+def test_raw_transcription_types_streamed_segments_as_they_arrive(app, np):
+    segments = iter([" Hello ", " ", "world. "])
+    with swap_attr(ptt_whisper, "recognize_audio_streaming", lambda *_a, **_k: segments):
+        app._transcribe_and_type(np.zeros(8, dtype=np.int16))
+    assert app._keyboard.typed == ["Hello", "  world."]
+    assert app._transcribing is False
+
+
+class _FakeRpcError(Exception):
+    def __init__(self, status_name: str) -> None:
+        super().__init__(status_name)
+        self._status = types.SimpleNamespace(name=status_name)
+
+    def code(self):
+        return self._status
+
+
+def test_streaming_rejection_falls_back_to_offline_recognition(app, np):
+    def _rejected(*_args, **_kwargs):
+        raise _FakeRpcError("UNIMPLEMENTED")
+        yield
+
+    with swap_attr(ptt_whisper, "recognize_audio_streaming", _rejected), swap_attr(
+        ptt_whisper, "recognize_audio", lambda *_a, **_k: ("hello", 0.1)
+    ):
+        app._transcribe_and_type(np.zeros(8, dtype=np.int16))
+    assert app._keyboard.typed == ["hello"]
+    assert app._streaming_asr is False
+
+
+def test_transient_streaming_error_keeps_streaming_for_next_utterance(app, np):
+    calls = []
+
+    def _flaky(*_args, **_kwargs):
+        calls.append(None)
+        if len(calls) == 1:
+            raise _FakeRpcError("UNAVAILABLE")
+        yield "world"
+
+    with swap_attr(ptt_whisper, "recognize_audio_streaming", _flaky), swap_attr(
+        ptt_whisper, "recognize_audio", lambda *_a, **_k: ("hello", 0.1)
+    ):
+        app._transcribe_and_type(np.zeros(8, dtype=np.int16))
+        assert app._streaming_asr is True
+        app._transcribe_and_type(np.zeros(8, dtype=np.int16))
+    assert app._keyboard.typed == ["hello", "world"]
+    assert len(calls) == 2
+
+
+def test_main_returns_error_when_run_raises_runtime_error():
+    args = types.SimpleNamespace(
+        sample_rate=16000,
+        audio_blocksize=256,
+        language="auto",
+        hold_delay=0.5,
+        mode=ptt_whisper.OUTPUT_MODE_RAW,
+        no_tray=False,
+        debug_console=False,
+        onboarding=False,
+    )
+    app = mock.Mock()
+    app.run.side_effect = RuntimeError("overlay failed")
+    with (
+        mock.patch("whispertocode.cli.parse_args", return_value=args),
+        mock.patch(
+            "whispertocode.cli.get_config_path",
+            return_value=types.SimpleNamespace(exists=lambda: True),
+        ),
+        mock.patch(
+            "whispertocode.cli.resolve_settings",
+            return_value=types.SimpleNamespace(
+                nvidia_api_key="key",
+                riva_server="grpc.nvcf.nvidia.com:443",
+                riva_function_id="b702f636-f60c-4a3d-a6f4-f3568c13bd7d",
+                nemotron_base_url="https://integrate.api.nvidia.com/v1",
+                nemotron_model="nvidia/nemotron-3-nano-30b-a3b",
+                nemotron_temperature=1.0,
+                nemotron_top_p=1.0,
+                nemotron_max_tokens=16384,
+                nemotron_reasoning_budget=4096,
+                nemotron_reasoning_print_limit=600,
+                nemotron_enable_thinking=True,
+            ),
+        ),
+        mock.patch("whispertocode.cli.load_config_json", return_value={}),
+        mock.patch("whispertocode.cli.load_env_fallback", return_value={}),
+        mock.patch("whispertocode.cli.HoldToTalkRiva", return_value=app),
+        mock.patch("whispertocode.cli.signal.signal"),
+    ):
+        code = cli_module.main()
+    assert code == 1
+
+
+def test_capsule_places_bottom_center():
+    geometry = types.SimpleNamespace(
+        x=lambda: 100,
+        y=lambda: 50,
+        width=lambda: 800,
+        height=lambda: 600,
+    )
+    screen = types.SimpleNamespace(
+        availableGeometry=mock.Mock(return_value=geometry),
+        availableGeometryChanged=mock.Mock(),
+    )
+    qt_gui = types.SimpleNamespace(
+        QGuiApplication=types.SimpleNamespace(primaryScreen=lambda: screen)
+    )
+    widget = mock.Mock()
+    widget.width.return_value = 150
+    widget.height.return_value = 100
+
+    overlay = object.__new__(overlay_module._CapsuleOverlayWidget)
+    overlay._qt_gui = qt_gui
+    overlay._widget = widget
+    overlay._target_opacity = 1.0
+    overlay._current_opacity = 1.0
+    overlay._geom_dirty = True
+    overlay._watched_screen = None
+
+    overlay._place_bottom_center()
+    overlay._place_bottom_center()
+
+    widget.move.assert_called_once_with(425, 530)
+    screen.availableGeometry.assert_called_once_with()
+    screen.availableGeometryChanged.connect.assert_called_once_with(overlay._invalidate_geometry)
+
+
+@pytest.mark.parametrize(("level", "repainted"), [(0.0, False), (0.5, True)])
+def test_animate_step_repaints_bar_strip_only_when_bars_move(level, repainted):
+    widget = mock.Mock()
+    widget.isVisible.return_value = True
+    widget.width.return_value = 160
+    widget.height.return_value = 48
+
+    overlay = object.__new__(overlay_module._CapsuleOverlayWidget)
+    overlay._widget = widget
+    overlay._last_tick = overlay_module.time.monotonic()
+    overlay._target_level = level
+    overlay._display_level = level
+    overlay._target_opacity = 1.0
+    overlay._current_opacity = 1.0
+
+    overlay.animate_step()
+
+    if repainted:
+        # 20 bars clamped to 2px plus 19 4px gaps span x 24..140, not the
+        # 112px between the paddings; 1px of antialiasing margin each side.
+        widget.update.assert_called_once_with(23, 11, 118, 26)
+    else:
+        widget.update.assert_not_called()
+
+
+def test_animate_step_is_idle_while_hidden():
+    widget = mock.Mock()
+    widget.isVisible.return_value = False
+
+    overlay = object.__new__(overlay_module._CapsuleOverlayWidget)
+    overlay._widget = widget
+    overlay._last_tick = 0.0
+    overlay._target_level = 0.3
+    overlay._display_level = 0.8
+    overlay._target_opacity = 0.0
+    overlay._current_opacity = 0.0
+
+    overlay.animate_step()
+
+    assert overlay._display_level == 0.3
+    assert overlay._last_tick > 0.0
+    widget.setWindowOpacity.assert_not_called()
+    widget.update.assert_not_called()
+
+
+def test_bar_position_gain_prefers_center_and_is_symmetric():
+    count = 20
+    center_left = overlay_module._CapsuleOverlayWidget._bar_position_gain(9, count)
+    center_right = overlay_module._CapsuleOverlayWidget._bar_position_gain(10, count)
+    edge_left = overlay_module._CapsuleOverlayWidget._bar_position_gain(0, count)
+    edge_right = overlay_module._CapsuleOverlayWidget._bar_position_gain(19, count)
+
+    assert center_left > edge_left
+    assert center_right > edge_right
+    assert center_left == pytest.approx(center_right, abs=1e-6)
+    assert edge_left == pytest.approx(edge_right, abs=1e-6)
+
+
+def test_position_gains_are_cached_per_bar_count():
+    widget_cls = overlay_module._CapsuleOverlayWidget
+    gains = widget_cls._position_gains_for(20)
+    assert widget_cls._position_gains_for(20) is gains
+    assert gains[9] == pytest.approx(widget_cls._bar_position_gain(9, 20))
+
+
+def test_compute_bar_levels_fills_buffer_in_place(np):
+    phases = np.arange(20, dtype=np.float64) * 0.4
+    gains = overlay_module._CapsuleOverlayWidget._position_gains_for(20)
+    out = np.empty(20)
+    levels = overlay_module._compute_bar_levels(1.5, phases, gains, 0.8, out)
+    expected = np.clip(0.8 * (0.3 + 0.7 * np.abs(np.sin(1.5 * 3.5 + phases))) * gains, 0.05, 1.0)
+    assert levels is out
+    assert np.allclose(levels, expected)
+
+
+def test_overlay_controller_keeps_only_latest_level():
+    controller = overlay_module.QtCapsuleOverlayController()
+    controller.update_level(0.2)
+    controller.update_level(0.7)
+    assert controller._pending_level == 0.7
+    assert not controller._commands
+
+
+def test_refresh_tray_menu_skips_unchanged_title(app):
+    class _TrayIcon:
+        def __init__(self, title):
+            self._title = title
+            self.title_sets = 0
+            self.menu_updates = 0
+
+        @property
+        def title(self):
+            return self._title
+
+        @title.setter
+        def title(self, value):
+            self._title = value
+            self.title_sets += 1
+
+        def update_menu(self):
+            self.menu_updates += 1
+
+    tray_icon = _TrayIcon(app._tray_title())
+    app._tray_icon = tray_icon
+    app._refresh_tray_menu()
+    assert (tray_icon.title_sets, tray_icon.menu_updates) == (0, 1)
+
+    app._output_mode = ptt_whisper.OUTPUT_MODE_SMART
+    app._refresh_tray_menu()
+    assert tray_icon.title == "WhisperToCode (SMART)"
+    assert (tray_icon.title_sets, tray_icon.menu_updates) == (1, 2)
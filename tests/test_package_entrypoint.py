@@ -1,4 +1,5 @@
 import importlib
+import runpy
 import unittest
 from unittest import mock
 
@@ -12,16 +13,18 @@ class PackageEntrypointTests(unittest.TestCase):
 
     def test_package_main_guard_uses_system_exit(self):
         main_module = importlib.import_module("whispertocode.__main__")
-        fake_globals = {
-            "__name__": "__main__",
-            "main": mock.Mock(return_value=3),
-            "SystemExit": SystemExit,
-            "__builtins__": __builtins__,
-        }
         with self.assertRaises(SystemExit) as exc:
-            exec("raise SystemExit(main())", fake_globals)
+            main_module._guard(lambda: 3)
         self.assertEqual(exc.exception.code, 3)
 
+    def test_running_package_as_main_exits_with_app_code(self):
+        # runpy warns if the module it is about to execute is already imported.
+        with mock.patch.dict("sys.modules"), mock.patch("whispertocode.cli.main", return_value=5):
+            importlib.sys.modules.pop("whispertocode.__main__", None)
+            with self.assertRaises(SystemExit) as exc:
+                runpy.run_module("whispertocode", run_name="__main__")
+        self.assertEqual(exc.exception.code, 5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,5 @@
+from typing import NoReturn
+
 from .cli import main as app_main
 
 
@@ -5,5 +7,9 @@ def main() -> int:
     return app_main()
 
 
+def _guard(main_fn) -> NoReturn:
+    raise SystemExit(main_fn())
+
+
 if __name__ == "__main__":
-    raise SystemExit(main())
+    _guard(main)
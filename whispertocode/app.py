@@ -1,18 +1,22 @@
+from __future__ import annotations
+
+import collections
+import functools
 import os
+import queue
 import sys
 import threading
 import time
 from typing import List, Optional, Tuple
 
-import numpy as np
-import riva.client
-import sounddevice as sd
-from pynput import keyboard
-
-from .config_store import AppSettings, load_config_json, load_env_fallback, resolve_settings, save_config_json
+from .config_store import (
+    AppSettings,
+    nemotron_settings,
+    resolve_settings_cached,
+    save_config_json,
+)
 from .constants import (
-    NEMOTRON_REASONING_BUDGET_MAX,
-    NEMOTRON_REASONING_PRINT_LIMIT_MAX,
+    AUDIO_BLOCKSIZE_DEFAULT,
     OUTPUT_MODE_RAW,
     OUTPUT_MODE_SMART,
     OVERLAY_FPS,
@@ -21,7 +25,13 @@ from .constants import (
     WINDOWS_SW_HIDE,
     WINDOWS_SW_SHOW,
 )
-from .audio_support import audio_callback, start_recording, stop_recording
+from .audio_support import (
+    audio_callback,
+    flush_audio_log,
+    start_recording,
+    stop_level_worker,
+    stop_recording,
+)
 from .hotkeys_support import (
     is_shift_key,
     on_press,
@@ -30,7 +40,13 @@ from .hotkeys_support import (
     start_recording_if_valid,
 )
 from .overlay import QtCapsuleOverlayController
-from .riva_asr import recognize_audio
+from .riva_asr import (
+    connect_asr_service,
+    is_streaming_unsupported,
+    recognize_audio,
+    recognize_audio_streaming,
+    warm_up_asr_service,
+)
 from .runtime_support import run_app, startup_banner_lines
 from .smart import build_smart_messages, ensure_nemotron_client, rewrite_text_streaming
 from .onboarding import run_onboarding
@@ -54,8 +70,75 @@ from .tray_support import (
     stop_tray,
     tray_title,
 )
+from .utils import lazy_import
+
+np = lazy_import("numpy")
+sd = lazy_import("sounddevice")
+keyboard = lazy_import("pynput.keyboard")
+
+# msvcrt scan codes that follow a "\x00"/"\xe0" prefix.
+_LOCAL_SPECIAL_KEY_MODES = {
+    "K": (OUTPUT_MODE_RAW, "Left Arrow"),
+    "M": (OUTPUT_MODE_SMART, "Right Arrow"),
+}
 
 class HoldToTalkRiva:
+    # Instance state lives in fixed slots; "__dict__" is kept so callers and
+    # tests can still attach or override callables per instance.
+    __slots__ = (
+        "__dict__",
+        "_api_key",
+        "server",
+        "function_id",
+        "sample_rate",
+        "audio_blocksize",
+        "language",
+        "hold_delay_sec",
+        "_output_mode",
+        "_tray_enabled",
+        "_debug_console",
+        "auth",
+        "asr_service",
+        "_streaming_asr",
+        "_lock",
+        "_recording",
+        "_transcribing",
+        "_ctrl_count",
+        "_press_token",
+        "_hold_requests",
+        "_hold_cancel",
+        "_hold_thread",
+        "_capture_buf",
+        "_capture_len",
+        "_level_blocks",
+        "_level_wake",
+        "_level_thread",
+        "_audio_log",
+        "_stream",
+        "_stop_event",
+        "_peak_level",
+        "_min_level",
+        "_level_ema",
+        "_keyboard",
+        "_local_hotkeys_enabled",
+        "_local_hotkeys_thread",
+        "_tray_icon",
+        "_tray_available",
+        "_overlay_controller",
+        "_console_visible",
+        "_nemotron_client",
+        "_settings_request_event",
+        "_settings_request_source",
+        "_nemotron_base_url",
+        "_nemotron_model",
+        "_nemotron_temperature",
+        "_nemotron_top_p",
+        "_nemotron_max_tokens",
+        "_nemotron_reasoning_budget",
+        "_reasoning_print_limit",
+        "_nemotron_enable_thinking",
+    )
+
     def __init__(
         self,
         sample_rate: int,
@@ -65,6 +148,7 @@ class HoldToTalkRiva:
         enable_tray: bool,
         debug_console: bool,
         settings: AppSettings,
+        audio_blocksize: int = AUDIO_BLOCKSIZE_DEFAULT,
     ) -> None:
         api_key = settings.nvidia_api_key.strip()
         if not api_key:
@@ -76,6 +160,7 @@ class HoldToTalkRiva:
         self.server = settings.riva_server
         self.function_id = settings.riva_function_id
         self.sample_rate = sample_rate
+        self.audio_blocksize = max(0, audio_blocksize)
         self.language = "multi" if language == "auto" else language
         self.hold_delay_sec = hold_delay_sec
         self._output_mode = self._normalize_output_mode(output_mode)
@@ -88,20 +173,37 @@ class HoldToTalkRiva:
         ]
 
         print(f"Connecting to Riva at {self.server}...")
-        self.auth = riva.client.Auth(
-            uri=self.server,
-            use_ssl=True,
-            metadata_args=metadata,
-        )
-        self.asr_service = riva.client.ASRService(self.auth)
+        self.auth, self.asr_service = connect_asr_service(self.server, metadata)
+        threading.Thread(
+            target=warm_up_asr_service,
+            args=(self.asr_service,),
+            kwargs={"sample_rate": sample_rate, "language": self.language},
+            daemon=True,
+        ).start()
+        # Cleared the first time the endpoint rejects streaming recognition
+        # (UNIMPLEMENTED/INVALID_ARGUMENT, e.g. offline-only Whisper
+        # functions); RAW mode then stays offline. Other errors only fall
+        # back for the current utterance.
+        self._streaming_asr = True
 
         self._lock = threading.Lock()
         self._recording = False
         self._transcribing = False
         self._ctrl_count = 0
         self._press_token = 0
-        self._hold_timer: Optional[threading.Timer] = None
-        self._chunks: List[np.ndarray] = []
+        self._hold_requests: queue.SimpleQueue = queue.SimpleQueue()
+        self._hold_cancel = threading.Event()
+        self._hold_thread: Optional[threading.Thread] = None
+        # Allocated by the first recording and reused across recordings.
+        self._capture_buf: Optional[np.ndarray] = None
+        self._capture_len = 0
+        # Captured block ranges waiting for the level worker; bounded so a
+        # stalled worker only loses meter updates, never audio.
+        self._level_blocks: collections.deque = collections.deque(maxlen=64)
+        self._level_wake = threading.Event()
+        self._level_thread: Optional[threading.Thread] = None
+        # Warnings raised on the PortAudio thread, printed by the main loop.
+        self._audio_log: collections.deque = collections.deque(maxlen=256)
         self._stream: Optional[sd.InputStream] = None
         self._stop_event = threading.Event()
         self._peak_level = 0.05
@@ -118,59 +220,75 @@ class HoldToTalkRiva:
         self._nemotron_client = None
         self._settings_request_event = threading.Event()
         self._settings_request_source = ""
-        self._nemotron_base_url = settings.nemotron_base_url.strip()
-        self._nemotron_model = settings.nemotron_model.strip()
-        self._nemotron_temperature = float(settings.nemotron_temperature)
-        self._nemotron_top_p = float(settings.nemotron_top_p)
-        self._nemotron_max_tokens = int(settings.nemotron_max_tokens)
-        raw_reasoning_budget = int(settings.nemotron_reasoning_budget)
-        self._nemotron_reasoning_budget = max(
-            0,
-            min(raw_reasoning_budget, NEMOTRON_REASONING_BUDGET_MAX),
-        )
-        if raw_reasoning_budget != self._nemotron_reasoning_budget:
+        nemotron = nemotron_settings(settings)
+        self._nemotron_base_url = nemotron.base_url
+        self._nemotron_model = nemotron.model
+        self._nemotron_temperature = nemotron.temperature
+        self._nemotron_top_p = nemotron.top_p
+        self._nemotron_max_tokens = nemotron.max_tokens
+        self._nemotron_reasoning_budget = nemotron.reasoning_budget
+        if int(settings.nemotron_reasoning_budget) != nemotron.reasoning_budget:
             print(
                 (
                     "NEMOTRON_REASONING_BUDGET was capped to "
-                    f"{self._nemotron_reasoning_budget}."
+                    f"{nemotron.reasoning_budget}."
                 ),
                 file=sys.stderr,
             )
-        raw_reasoning_print_limit = int(settings.nemotron_reasoning_print_limit)
-        self._reasoning_print_limit = max(
-            0,
-            min(raw_reasoning_print_limit, NEMOTRON_REASONING_PRINT_LIMIT_MAX),
+        self._reasoning_print_limit = nemotron.reasoning_print_limit
+        self._nemotron_enable_thinking = nemotron.enable_thinking
+
+        # Callbacks driven by PortAudio and pynput threads skip the wrapper
+        # method frame; the methods below remain as the class-level fallback.
+        self._audio_callback = functools.partial(audio_callback, self)
+        self._on_press = functools.partial(
+            on_press, self, keyboard_module=keyboard, threading_module=threading
         )
-        self._nemotron_enable_thinking = bool(settings.nemotron_enable_thinking)
+        self._on_release = functools.partial(on_release, self, keyboard_module=keyboard)
 
     @staticmethod
     def _normalize_output_mode(mode: str) -> str:
+        # Tray and hotkey handlers pass the constants themselves.
+        if mode is OUTPUT_MODE_RAW or mode is OUTPUT_MODE_SMART:
+            return mode
         normalized = (mode or "").strip().lower()
         if normalized == OUTPUT_MODE_SMART:
             return OUTPUT_MODE_SMART
         return OUTPUT_MODE_RAW
 
     def _get_output_mode(self) -> str:
-        with self._lock:
-            return self._output_mode
+        # A single attribute load is atomic; only writers take the lock.
+        return self._output_mode
 
     def _set_output_mode(self, mode: str, source: str = "") -> None:
         normalized = self._normalize_output_mode(mode)
+        if self._output_mode == normalized:
+            return
         with self._lock:
             if self._output_mode == normalized:
                 return
             self._output_mode = normalized
+        # Side effects run outside the lock: tray and Qt calls may block.
+        self._publish_mode_change(normalized, source)
+
+    def _publish_mode_change(self, mode: str, source: str) -> None:
         source_suffix = f" ({source})" if source else ""
-        print(f"Mode: {normalized.upper()}{source_suffix}")
-        self._refresh_tray_menu()
-        self._set_overlay_mode(normalized)
+        print(f"Mode: {mode.upper()}{source_suffix}")
+        if self._tray_icon is not None:
+            self._refresh_tray_menu()
+        if self._overlay_controller is not None:
+            self._set_overlay_mode(mode)
 
     def _refresh_tray_menu(self) -> None:
-        tray_icon = getattr(self, "_tray_icon", None)
+        tray_icon = self._tray_icon
         if tray_icon is None:
             return
         try:
-            tray_icon.title = self._tray_title()
+            title = self._tray_title()
+            # Setting the title re-sends the whole notify-icon record on
+            # Windows, so skip it when nothing changed.
+            if tray_icon.title != title:
+                tray_icon.title = title
             tray_icon.update_menu()
         except Exception:
             # Tray refresh failures are non-fatal for STT flow.
@@ -184,7 +302,7 @@ class HoldToTalkRiva:
         )
 
     def _start_overlay(self) -> None:
-        if getattr(self, "_overlay_controller", None) is not None:
+        if self._overlay_controller is not None:
             return
         try:
             overlay_controller = self._create_overlay_controller()
@@ -195,7 +313,7 @@ class HoldToTalkRiva:
             raise RuntimeError(f"Overlay initialization failed: {exc}") from exc
 
     def _stop_overlay(self) -> None:
-        overlay_controller = getattr(self, "_overlay_controller", None)
+        overlay_controller = self._overlay_controller
         if overlay_controller is None:
             return
         try:
@@ -204,38 +322,35 @@ class HoldToTalkRiva:
             self._overlay_controller = None
 
     def _show_overlay_recording(self) -> None:
-        overlay_controller = getattr(self, "_overlay_controller", None)
+        overlay_controller = self._overlay_controller
         if overlay_controller is None:
             return
         overlay_controller.show_recording(self._get_output_mode())
 
     def _hide_overlay(self) -> None:
-        overlay_controller = getattr(self, "_overlay_controller", None)
+        overlay_controller = self._overlay_controller
         if overlay_controller is None:
             return
         overlay_controller.hide()
 
     def _set_overlay_mode(self, mode: str) -> None:
-        overlay_controller = getattr(self, "_overlay_controller", None)
+        overlay_controller = self._overlay_controller
         if overlay_controller is None:
             return
         overlay_controller.set_mode(mode)
 
     def _update_overlay_level(self, level: float) -> None:
-        overlay_controller = getattr(self, "_overlay_controller", None)
+        overlay_controller = self._overlay_controller
         if overlay_controller is None:
             return
         overlay_controller.update_level(level)
 
     def _handle_local_special_key(self, key_code: str) -> bool:
-        normalized = (key_code or "").upper()
-        if normalized == "K":
-            self._set_output_mode(OUTPUT_MODE_RAW, "Left Arrow")
-            return True
-        if normalized == "M":
-            self._set_output_mode(OUTPUT_MODE_SMART, "Right Arrow")
-            return True
-        return False
+        entry = _LOCAL_SPECIAL_KEY_MODES.get((key_code or "").upper())
+        if entry is None:
+            return False
+        self._set_output_mode(*entry)
+        return True
 
     def _handle_local_console_char(self, char: str) -> bool:
         if char == "\x1b":
@@ -287,9 +402,9 @@ class HoldToTalkRiva:
             source = self._settings_request_source
             self._settings_request_source = ""
 
-        current = resolve_settings(load_config_json(), load_env_fallback())
+        current = resolve_settings_cached()
         try:
-            overlay_controller = getattr(self, "_overlay_controller", None)
+            overlay_controller = self._overlay_controller
             if overlay_controller is not None:
                 updated = overlay_controller.run_onboarding_dialog(current)
             else:
@@ -340,6 +455,12 @@ class HoldToTalkRiva:
     def _stop_recording(self) -> None:
         stop_recording(self)
 
+    def _flush_audio_log(self) -> None:
+        flush_audio_log(self)
+
+    def _stop_level_worker(self) -> None:
+        stop_level_worker(self)
+
     def _transcribe_and_type(self, audio: np.ndarray) -> None:
         with self._lock:
             if self._transcribing:
@@ -348,6 +469,11 @@ class HoldToTalkRiva:
             self._transcribing = True
 
         try:
+            mode_snapshot = self._get_output_mode()
+            if mode_snapshot != OUTPUT_MODE_SMART and self._streaming_asr:
+                if self._type_streaming_transcript(audio):
+                    return
+
             text, took = recognize_audio(
                 self.asr_service,
                 audio=audio,
@@ -359,7 +485,6 @@ class HoldToTalkRiva:
                 print("No speech recognized.")
                 return
 
-            mode_snapshot = self._get_output_mode()
             print(f"Recognized ({self.language}, {took:.2f}s, {mode_snapshot.upper()}): {text}")
             self._type_output_text(text, mode_snapshot)
         except Exception as exc:
@@ -368,6 +493,45 @@ class HoldToTalkRiva:
             with self._lock:
                 self._transcribing = False
 
+    def _type_streaming_transcript(self, audio: np.ndarray) -> bool:
+        # RAW mode types each final segment as it arrives. Trailing whitespace
+        # is held back so the typed text matches the stripped offline result.
+        start = time.time()
+        typed: List[str] = []
+        pending = ""
+        try:
+            for segment in recognize_audio_streaming(
+                self.asr_service,
+                audio=audio,
+                sample_rate=self.sample_rate,
+                language=self.language,
+            ):
+                if not segment.strip():
+                    pending += segment if typed else ""
+                    continue
+                if not typed:
+                    segment = segment.lstrip()
+                body = segment.rstrip()
+                self._keyboard.type(pending + body)
+                typed.append(pending + body)
+                pending = segment[len(body):]
+        except Exception as exc:
+            if typed:
+                raise
+            if is_streaming_unsupported(exc):
+                self._streaming_asr = False
+                print(f"Streaming recognition unavailable, using offline: {exc}", file=sys.stderr)
+            else:
+                print(f"Streaming recognition failed, retrying offline: {exc}", file=sys.stderr)
+            return False
+
+        if not typed:
+            print("No speech recognized.")
+            return True
+        took = time.time() - start
+        print(f"Recognized ({self.language}, {took:.2f}s, {OUTPUT_MODE_RAW.upper()}): {''.join(typed)}")
+        return True
+
     def _type_output_text(self, text: str, mode_snapshot: str) -> None:
         if mode_snapshot != OUTPUT_MODE_SMART:
             self._keyboard.type(text)
@@ -388,6 +552,9 @@ class HoldToTalkRiva:
         return build_smart_messages(raw_text)
 
     def _get_nemotron_client(self):
+        client = self._nemotron_client
+        if client is not None:
+            return client
         self._nemotron_client = ensure_nemotron_client(
             current_client=self._nemotron_client,
             base_url=self._nemotron_base_url,
@@ -396,10 +563,6 @@ class HoldToTalkRiva:
         return self._nemotron_client
 
     def _rewrite_text_streaming(self, raw_text: str) -> Tuple[bool, Optional[Exception]]:
-        reasoning_budget = max(
-            0,
-            min(self._nemotron_reasoning_budget, NEMOTRON_REASONING_BUDGET_MAX),
-        )
         return rewrite_text_streaming(
             raw_text=raw_text,
             get_client=self._get_nemotron_client,
@@ -408,7 +571,7 @@ class HoldToTalkRiva:
             temperature=self._nemotron_temperature,
             top_p=self._nemotron_top_p,
             max_tokens=self._nemotron_max_tokens,
-            reasoning_budget=reasoning_budget,
+            reasoning_budget=self._nemotron_reasoning_budget,
             enable_thinking=self._nemotron_enable_thinking,
             reasoning_print_limit=self._reasoning_print_limit,
             type_char=self._keyboard.type,
@@ -438,7 +601,6 @@ class HoldToTalkRiva:
             self,
             keyboard_module=keyboard,
             threading_module=threading,
-            time_module=time,
             os_module=os,
         )
 
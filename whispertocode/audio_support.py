@@ -1,57 +1,158 @@
+import math
 import sys
 import threading
-from typing import Optional
+import time
+
+from .constants import MAX_RECORD_SECONDS, OVERLAY_FPS
+from .utils import lazy_import
+
+np = lazy_import("numpy")
+
+# Capture runs in 16-bit PCM, the format Riva's LINEAR_PCM upload expects.
+CAPTURE_DTYPE = "int16"
+_PCM16_FULL_SCALE = 32768.0
+# Clips whose peak stays under ~-54 dBFS are mic noise, not speech.
+_SILENCE_PEAK = int(0.002 * _PCM16_FULL_SCALE)
+
+# Level meter tuning: EMA attack/release, peak decay and reference headroom.
+_EMA_ALPHA_UP = 0.22
+_EMA_ALPHA_DOWN = 0.08
+_PEAK_DECAY = 0.997
+_REF_GAIN = 1.35
+
+# Level changes smaller than this within one overlay frame aren't visible.
+_LEVEL_EPSILON = 0.01
+_LEVEL_MIN_INTERVAL = 1.0 / OVERLAY_FPS
+
+
+def _append_audio(app, samples) -> None:
+    # Caller holds app._lock. Runs on the PortAudio thread, so it only copies
+    # into the buffer start_recording() allocated; audio past the cap is dropped.
+    buffer = app._capture_buf
+    start = app._capture_len
+    count = min(len(samples), len(buffer) - start)
+    if count < len(samples) and start < len(buffer):
+        app._audio_log.append(
+            f"Recording limit of {MAX_RECORD_SECONDS}s reached; further audio is ignored."
+        )
+    if count <= 0:
+        return
+    buffer[start:start + count] = samples[:count]
+    app._capture_len = start + count
 
-import numpy as np
 
+def _compute_level(frame, level_ema: float, peak_level: float, min_level: float):
+    # Pure level math for one mono int16 block; returns
+    # (overlay_level, new_level_ema, new_peak_level).
+    # int16 samples can't exceed full scale, so no clip is needed. Widen
+    # before the dot product so the sum of squares can't overflow int16.
+    samples = frame.astype(np.float32)
+    sum_squares = float(np.dot(samples, samples))
+    raw_level = min(1.0, math.sqrt(sum_squares / samples.size) / _PCM16_FULL_SCALE)
 
-def audio_callback(app, indata, _frames, _time_info, status) -> None:
-    if status:
-        print(f"Audio warning: {status}", file=sys.stderr)
-    level_value: Optional[float] = None
-    with app._lock:
-        if app._recording:
-            app._chunks.append(indata.copy())
-            frame = np.asarray(indata, dtype=np.float32)
-            if frame.size > 0:
-                if frame.ndim > 1:
-                    frame = frame[:, 0]
-                raw_level = float(np.sqrt(np.mean(np.square(np.clip(frame, -1.0, 1.0)))))
+    if raw_level > peak_level:
+        peak_level = raw_level
+    else:
+        peak_level = max(min_level, peak_level * _PEAK_DECAY)
 
-                if not hasattr(app, "_level_ema"):
-                    app._level_ema = max(app._min_level, raw_level)
+    # Adaptive gain for quiet/loud microphones without filtering out real activity.
+    alpha = _EMA_ALPHA_UP if raw_level >= level_ema else _EMA_ALPHA_DOWN
+    level_ema += alpha * (raw_level - level_ema)
 
-                if raw_level > app._peak_level:
-                    app._peak_level = raw_level
-                else:
-                    app._peak_level = max(app._min_level, app._peak_level * 0.997)
+    reference_level = max(min_level, level_ema * _REF_GAIN)
+    normalized_level = max(0.0, (raw_level / reference_level) * 1.2)
+    return normalized_level / (1.0 + normalized_level), level_ema, peak_level
 
-                # Adaptive gain for quiet/loud microphones without filtering out real activity.
-                if raw_level >= app._level_ema:
-                    app._level_ema += (raw_level - app._level_ema) * 0.22
-                else:
-                    app._level_ema += (raw_level - app._level_ema) * 0.08
 
-                reference_level = max(app._min_level, app._level_ema * 1.35)
-                normalized_level = max(0.0, (raw_level / reference_level) * 1.2)
-                level_value = normalized_level / (1.0 + normalized_level)
+def audio_callback(app, indata, _frames, _time_info, status) -> None:
+    # PortAudio thread: copy the block into the capture buffer and hand its
+    # range to the level worker; all DSP and console output happen elsewhere.
+    if status:
+        app._audio_log.append(f"Audio warning: {status}")
+    frame = indata[:, 0] if indata.ndim > 1 else indata
+    if frame.size == 0:
+        return
+    with app._lock:
+        if not app._recording:
+            return
+        start = app._capture_len
+        _append_audio(app, frame)
+        end = app._capture_len
+    if end > start:
+        app._level_blocks.append((start, end))
+        app._level_wake.set()
+
+
+def flush_audio_log(app) -> None:
+    # Main-thread side of the audio log; the callback only appends.
+    log = app._audio_log
+    while log:
+        print(log.popleft(), file=sys.stderr)
+
+
+def level_worker_loop(app) -> None:
+    blocks = app._level_blocks
+    wake = app._level_wake
+    last_level = -1.0
+    last_emit = 0.0
+    while True:
+        wake.wait()
+        wake.clear()
+        while blocks:
+            block = blocks.popleft()
+            if block is None:
+                return
+            start, end = block
+            level_value, app._level_ema, app._peak_level = _compute_level(
+                app._capture_buf[start:end],
+                app._level_ema,
+                app._peak_level,
+                app._min_level,
+            )
+            now = time.monotonic()
+            if (
+                abs(level_value - last_level) <= _LEVEL_EPSILON
+                and now - last_emit < _LEVEL_MIN_INTERVAL
+            ):
+                continue
+            last_level = level_value
+            last_emit = now
+            app._update_overlay_level(level_value)
+
+
+def _ensure_level_worker(app) -> None:
+    thread = app._level_thread
+    if thread is not None and thread.is_alive():
+        return
+    thread = threading.Thread(target=level_worker_loop, args=(app,), daemon=True)
+    app._level_thread = thread
+    thread.start()
+
 
-    if level_value is not None:
-        app._update_overlay_level(level_value)
+def stop_level_worker(app) -> None:
+    app._level_blocks.append(None)
+    app._level_wake.set()
 
 
 def start_recording(app, sd_module) -> None:
     with app._lock:
         if app._recording or app._transcribing:
             return
-        app._chunks = []
+        if app._capture_buf is None:
+            app._capture_buf = np.empty(
+                app.sample_rate * MAX_RECORD_SECONDS, dtype=CAPTURE_DTYPE
+            )
+        app._capture_len = 0
         app._recording = True
+    _ensure_level_worker(app)
 
     try:
         app._stream = sd_module.InputStream(
             samplerate=app.sample_rate,
             channels=1,
-            dtype="float32",
+            dtype=CAPTURE_DTYPE,
+            blocksize=app.audio_blocksize,
+            latency="low",
             callback=app._audio_callback,
         )
         app._stream.start()
@@ -68,8 +169,10 @@ def stop_recording(app) -> None:
         if not app._recording:
             return
         app._recording = False
-        chunks = app._chunks
-        app._chunks = []
+        captured = app._capture_len
+        app._capture_len = 0
+        # One contiguous copy so the worker never shares the reused buffer.
+        audio = app._capture_buf[:captured].copy() if captured else None
     app._hide_overlay()
 
     if app._stream is not None:
@@ -80,12 +183,7 @@ def stop_recording(app) -> None:
             pass
         app._stream = None
 
-    if not chunks:
-        print("No audio captured.")
-        return
-
-    audio = np.concatenate(chunks, axis=0).squeeze()
-    if audio.ndim == 0:
+    if audio is None:
         print("No audio captured.")
         return
 
@@ -94,6 +192,11 @@ def stop_recording(app) -> None:
         print("Too short, skipped.")
         return
 
+    # Widen before negating so -32768 can't wrap around.
+    if max(int(audio.max()), -int(audio.min())) < _SILENCE_PEAK:
+        print("No speech detected, skipped.")
+        return
+
     worker = threading.Thread(
         target=app._transcribe_and_type, args=(audio,), daemon=True
     )
@@ -3,8 +3,6 @@ import signal
 import sys
 from typing import List, Optional
 
-from dotenv import load_dotenv
-
 from .app import HoldToTalkRiva
 from .config_store import (
     get_config_path,
@@ -13,7 +11,7 @@ from .config_store import (
     resolve_settings,
     save_config_json,
 )
-from .constants import OUTPUT_MODE_RAW, OUTPUT_MODE_SMART
+from .constants import AUDIO_BLOCKSIZE_DEFAULT, OUTPUT_MODE_RAW, OUTPUT_MODE_SMART
 from .onboarding import run_onboarding
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
@@ -29,6 +27,15 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=16000,
         help="Microphone sample rate",
     )
+    parser.add_argument(
+        "--audio-blocksize",
+        type=int,
+        default=AUDIO_BLOCKSIZE_DEFAULT,
+        help=(
+            "Samples per audio callback (0 lets PortAudio choose). Smaller blocks "
+            "cut latency but may drop audio under heavy CPU load."
+        ),
+    )
     parser.add_argument(
         "--language",
         default="auto",
@@ -68,6 +75,8 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
 def main() -> int:
     args = parse_args()
     try:
+        from dotenv import load_dotenv
+
         load_dotenv()
         config_path = get_config_path()
         config_exists = config_path.exists()
@@ -87,6 +96,7 @@ def main() -> int:
 
         app = HoldToTalkRiva(
             sample_rate=args.sample_rate,
+            audio_blocksize=args.audio_blocksize,
             language=args.language,
             hold_delay_sec=args.hold_delay,
             output_mode=args.mode,
@@ -1,6 +1,9 @@
 import json
 import os
-from dataclasses import asdict, dataclass
+import sys
+import time
+from functools import lru_cache
+from dataclasses import dataclass, fields
 from pathlib import Path
 from typing import Any, Mapping
 
@@ -16,6 +19,9 @@ DEFAULT_RIVA_FUNCTION_ID = "b702f636-f60c-4a3d-a6f4-f3568c13bd7d"
 DEFAULT_NEMOTRON_BASE_URL = "https://integrate.api.nvidia.com/v1"
 DEFAULT_NEMOTRON_MODEL = "nvidia/nemotron-3-nano-30b-a3b"
 
+_IS_WIN = os.name == "nt"
+_IS_DARWIN = os.name == "posix" and sys.platform.startswith("darwin")
+
 
 @dataclass(frozen=True)
 class AppSettings:
@@ -32,14 +38,56 @@ class AppSettings:
     nemotron_enable_thinking: bool = True
 
 
+# AppSettings is flat and JSON-native, so a shallow field read replaces
+# dataclasses.asdict() and its recursive deep copy.
+_SETTINGS_FIELD_NAMES = tuple(field.name for field in fields(AppSettings))
+
+
+def settings_as_dict(settings: AppSettings) -> dict[str, Any]:
+    return {name: getattr(settings, name) for name in _SETTINGS_FIELD_NAMES}
+
+
+@dataclass(frozen=True)
+class NemotronSettings:
+    base_url: str
+    model: str
+    temperature: float
+    top_p: float
+    max_tokens: int
+    reasoning_budget: int
+    reasoning_print_limit: int
+    enable_thinking: bool
+
+
+@lru_cache(maxsize=8)
+def nemotron_settings(settings: AppSettings) -> NemotronSettings:
+    return NemotronSettings(
+        base_url=settings.nemotron_base_url.strip(),
+        model=settings.nemotron_model.strip(),
+        temperature=float(settings.nemotron_temperature),
+        top_p=float(settings.nemotron_top_p),
+        max_tokens=int(settings.nemotron_max_tokens),
+        reasoning_budget=max(
+            0,
+            min(int(settings.nemotron_reasoning_budget), NEMOTRON_REASONING_BUDGET_MAX),
+        ),
+        reasoning_print_limit=max(
+            0,
+            min(int(settings.nemotron_reasoning_print_limit), NEMOTRON_REASONING_PRINT_LIMIT_MAX),
+        ),
+        enable_thinking=bool(settings.nemotron_enable_thinking),
+    )
+
+
+@lru_cache(maxsize=1)
 def get_config_dir() -> Path:
-    if os.name == "nt":
+    if _IS_WIN:
         base = os.getenv("APPDATA")
         if base:
             return Path(base) / "WhisperToCode"
         return Path.home() / "AppData" / "Roaming" / "WhisperToCode"
 
-    if os.name == "posix" and sys_platform_startswith("darwin"):
+    if _IS_DARWIN:
         return Path.home() / "Library" / "Application Support" / "WhisperToCode"
 
     xdg = os.getenv("XDG_CONFIG_HOME")
@@ -48,185 +96,180 @@ def get_config_dir() -> Path:
     return Path.home() / ".config" / "whispertocode"
 
 
+# Tray "Settings" clicks re-read config.json and the environment; a short TTL
+# keeps repeated clicks off the disk. save_config_json() invalidates it.
+_SETTINGS_CACHE_TTL_SEC = 5.0
+_settings_cache: "tuple[float, AppSettings | None]" = (0.0, None)
+# Last parsed config.json, keyed by path and mtime so edits made outside the
+# app are still picked up.
+_config_cache: "tuple[Path, int, dict[str, Any]] | None" = None
+
+
 def get_config_path() -> Path:
     return get_config_dir() / "config.json"
 
 
 def load_config_json() -> dict[str, Any]:
+    global _config_cache
     path = get_config_path()
-    if not path.exists():
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
         return {}
+    cached = _config_cache
+    if cached is not None and cached[0] == path and cached[1] == mtime_ns:
+        return dict(cached[2])
     try:
-        with path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
-    except Exception:
+        data = json.loads(path.read_bytes())
+    except (OSError, ValueError):
         return {}
     if not isinstance(data, dict):
         return {}
-    return data
+    _config_cache = (path, mtime_ns, data)
+    return dict(data)
 
 
 def save_config_json(settings: AppSettings) -> None:
+    global _settings_cache, _config_cache
+    _settings_cache = (0.0, None)
     path = get_config_path()
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(asdict(settings), handle, ensure_ascii=False, indent=2)
+    data = settings_as_dict(settings)
+    payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    # Write a sibling temp file and swap it in, so a crash mid-write can't
+    # leave a truncated config.json behind.
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+    _config_cache = (path, path.stat().st_mtime_ns, data)
+
+
+_ENV_KEYS: tuple[str, ...] = (
+    "NVIDIA_API_KEY",
+    "RIVA_SERVER",
+    "RIVA_FUNCTION_ID",
+    "NEMOTRON_BASE_URL",
+    "NEMOTRON_MODEL",
+    "NEMOTRON_TEMPERATURE",
+    "NEMOTRON_TOP_P",
+    "NEMOTRON_MAX_TOKENS",
+    "NEMOTRON_REASONING_BUDGET",
+    "NEMOTRON_REASONING_PRINT_LIMIT",
+    "NEMOTRON_ENABLE_THINKING",
+)
+# Snapshot of the process environment, taken on first use (after
+# load_dotenv() in cli.main); nothing in the app changes it afterwards.
+_env_snapshot: "dict[str, str] | None" = None
 
 
 def load_env_fallback(env: Mapping[str, str] | None = None) -> dict[str, str]:
-    source = env if env is not None else os.environ
-    keys = [
-        "NVIDIA_API_KEY",
-        "RIVA_SERVER",
-        "RIVA_FUNCTION_ID",
-        "NEMOTRON_BASE_URL",
-        "NEMOTRON_MODEL",
-        "NEMOTRON_TEMPERATURE",
-        "NEMOTRON_TOP_P",
-        "NEMOTRON_MAX_TOKENS",
-        "NEMOTRON_REASONING_BUDGET",
-        "NEMOTRON_REASONING_PRINT_LIMIT",
-        "NEMOTRON_ENABLE_THINKING",
-    ]
-    result: dict[str, str] = {}
-    for key in keys:
-        raw = source.get(key)
-        if raw is None:
-            continue
-        result[key] = str(raw).strip()
-    return result
+    global _env_snapshot
+    if env is None:
+        if _env_snapshot is None:
+            _env_snapshot = _read_env_keys(os.environ)
+        return dict(_env_snapshot)
+    return _read_env_keys(env)
 
 
-def resolve_settings(config_json: Mapping[str, Any], env_map: Mapping[str, str]) -> AppSettings:
-    cfg = dict(config_json or {})
-    env = dict(env_map or {})
-
-    def _pick_str(cfg_key: str, env_key: str, default: str) -> str:
-        cfg_value = cfg.get(cfg_key)
-        if isinstance(cfg_value, str):
-            stripped = cfg_value.strip()
-            if stripped:
-                return stripped
-        env_value = env.get(env_key)
-        if isinstance(env_value, str) and env_value.strip():
-            return env_value.strip()
-        return default
-
-    def _pick_float(cfg_key: str, env_key: str, default: float) -> float:
-        cfg_value = cfg.get(cfg_key)
-        if isinstance(cfg_value, (int, float)):
-            return float(cfg_value)
-        cfg_text = cfg_value if isinstance(cfg_value, str) else None
-        if cfg_text is not None:
-            try:
-                return float(cfg_text.strip())
-            except ValueError:
-                pass
-        env_text = env.get(env_key)
-        if isinstance(env_text, str):
-            try:
-                return float(env_text.strip())
-            except ValueError:
-                pass
-        return default
-
-    def _pick_int(cfg_key: str, env_key: str, default: int) -> int:
-        cfg_value = cfg.get(cfg_key)
-        if isinstance(cfg_value, int):
-            return cfg_value
-        cfg_text = cfg_value if isinstance(cfg_value, str) else None
-        if cfg_text is not None:
-            try:
-                return int(cfg_text.strip())
-            except ValueError:
-                pass
-        env_text = env.get(env_key)
-        if isinstance(env_text, str):
+def _read_env_keys(source: Mapping[str, str]) -> dict[str, str]:
+    return {
+        key: str(raw).strip()
+        for key in _ENV_KEYS
+        if (raw := source.get(key)) is not None
+    }
+
+
+_MISSING = object()
+
+
+def _coerce(value: Any, kind: type) -> Any:
+    # Returns value as `kind`, or _MISSING when it is absent, blank or invalid.
+    match value:
+        case str():
+            text = value.strip()
+            if not text:
+                return _MISSING
+            if kind is str:
+                return text
+            if kind is bool:
+                parsed = _parse_bool(text)
+                return _MISSING if parsed is None else parsed
             try:
-                return int(env_text.strip())
+                return kind(text)
             except ValueError:
-                pass
-        return default
-
-    def _pick_bool(cfg_key: str, env_key: str, default: bool) -> bool:
-        cfg_value = cfg.get(cfg_key)
-        if isinstance(cfg_value, bool):
-            return cfg_value
-        if isinstance(cfg_value, str):
-            parsed = _parse_bool(cfg_value)
-            if parsed is not None:
-                return parsed
-        env_text = env.get(env_key)
-        if isinstance(env_text, str):
-            parsed = _parse_bool(env_text)
-            if parsed is not None:
-                return parsed
-        return default
-
-    reasoning_budget = _pick_int(
+                return _MISSING
+        case bool() if kind is bool:
+            return value
+        case int() | float() if kind is float:
+            return float(value)
+        case int() if kind is int:
+            return value
+    return _MISSING
+
+
+# (AppSettings field / config.json key, environment key, type, default).
+_SETTING_FIELDS = (
+    ("nvidia_api_key", "NVIDIA_API_KEY", str, ""),
+    ("riva_server", "RIVA_SERVER", str, DEFAULT_RIVA_SERVER),
+    ("riva_function_id", "RIVA_FUNCTION_ID", str, DEFAULT_RIVA_FUNCTION_ID),
+    ("nemotron_base_url", "NEMOTRON_BASE_URL", str, DEFAULT_NEMOTRON_BASE_URL),
+    ("nemotron_model", "NEMOTRON_MODEL", str, DEFAULT_NEMOTRON_MODEL),
+    ("nemotron_temperature", "NEMOTRON_TEMPERATURE", float, 1.0),
+    ("nemotron_top_p", "NEMOTRON_TOP_P", float, 1.0),
+    ("nemotron_max_tokens", "NEMOTRON_MAX_TOKENS", int, 16384),
+    (
         "nemotron_reasoning_budget",
         "NEMOTRON_REASONING_BUDGET",
+        int,
         NEMOTRON_REASONING_BUDGET_DEFAULT,
-    )
-    reasoning_budget = max(0, min(reasoning_budget, NEMOTRON_REASONING_BUDGET_MAX))
-
-    reasoning_print_limit = _pick_int(
+    ),
+    (
         "nemotron_reasoning_print_limit",
         "NEMOTRON_REASONING_PRINT_LIMIT",
+        int,
         NEMOTRON_REASONING_PRINT_LIMIT_DEFAULT,
+    ),
+    ("nemotron_enable_thinking", "NEMOTRON_ENABLE_THINKING", bool, True),
+)
+
+
+def resolve_settings(config_json: Mapping[str, Any], env_map: Mapping[str, str]) -> AppSettings:
+    cfg = config_json or {}
+    env = env_map or {}
+    values = {}
+    for name, env_key, kind, default in _SETTING_FIELDS:
+        value = _coerce(cfg.get(name), kind)
+        if value is _MISSING:
+            value = _coerce(env.get(env_key), kind)
+        values[name] = default if value is _MISSING else value
+    values["nemotron_reasoning_budget"] = max(
+        0, min(values["nemotron_reasoning_budget"], NEMOTRON_REASONING_BUDGET_MAX)
     )
-    reasoning_print_limit = max(
-        0,
-        min(reasoning_print_limit, NEMOTRON_REASONING_PRINT_LIMIT_MAX),
+    values["nemotron_reasoning_print_limit"] = max(
+        0, min(values["nemotron_reasoning_print_limit"], NEMOTRON_REASONING_PRINT_LIMIT_MAX)
     )
+    return AppSettings(**values)
 
-    return AppSettings(
-        nvidia_api_key=_pick_str("nvidia_api_key", "NVIDIA_API_KEY", ""),
-        riva_server=_pick_str("riva_server", "RIVA_SERVER", DEFAULT_RIVA_SERVER),
-        riva_function_id=_pick_str(
-            "riva_function_id",
-            "RIVA_FUNCTION_ID",
-            DEFAULT_RIVA_FUNCTION_ID,
-        ),
-        nemotron_base_url=_pick_str(
-            "nemotron_base_url",
-            "NEMOTRON_BASE_URL",
-            DEFAULT_NEMOTRON_BASE_URL,
-        ),
-        nemotron_model=_pick_str(
-            "nemotron_model",
-            "NEMOTRON_MODEL",
-            DEFAULT_NEMOTRON_MODEL,
-        ),
-        nemotron_temperature=_pick_float(
-            "nemotron_temperature",
-            "NEMOTRON_TEMPERATURE",
-            1.0,
-        ),
-        nemotron_top_p=_pick_float("nemotron_top_p", "NEMOTRON_TOP_P", 1.0),
-        nemotron_max_tokens=_pick_int(
-            "nemotron_max_tokens",
-            "NEMOTRON_MAX_TOKENS",
-            16384,
-        ),
-        nemotron_reasoning_budget=reasoning_budget,
-        nemotron_reasoning_print_limit=reasoning_print_limit,
-        nemotron_enable_thinking=_pick_bool(
-            "nemotron_enable_thinking",
-            "NEMOTRON_ENABLE_THINKING",
-            True,
-        ),
-    )
+
+def resolve_settings_cached(ttl: float = _SETTINGS_CACHE_TTL_SEC) -> AppSettings:
+    global _settings_cache
+    stamp, cached = _settings_cache
+    now = time.monotonic()
+    if cached is not None and now - stamp < ttl:
+        return cached
+    settings = resolve_settings(load_config_json(), load_env_fallback())
+    _settings_cache = (now, settings)
+    return settings
 
 
-def sys_platform_startswith(prefix: str) -> bool:
-    return os.sys.platform.startswith(prefix)
+_TRUE_TOKENS = frozenset({"1", "true", "yes", "on"})
+_FALSE_TOKENS = frozenset({"0", "false", "no", "off"})
 
 
 def _parse_bool(value: str) -> bool | None:
     normalized = value.strip().lower()
-    if normalized in {"1", "true", "yes", "on"}:
+    if normalized in _TRUE_TOKENS:
         return True
-    if normalized in {"0", "false", "no", "off"}:
+    if normalized in _FALSE_TOKENS:
         return False
     return None
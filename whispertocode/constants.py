@@ -6,6 +6,10 @@ NEMOTRON_REASONING_BUDGET_MAX = 4096
 NEMOTRON_REASONING_PRINT_LIMIT_DEFAULT = 600
 NEMOTRON_REASONING_PRINT_LIMIT_MAX = 4000
 
+MAX_RECORD_SECONDS = 300
+STREAM_CHUNK_SEC = 0.32
+AUDIO_BLOCKSIZE_DEFAULT = 256
+
 WINDOWS_SW_HIDE = 0
 WINDOWS_SW_SHOW = 5
 
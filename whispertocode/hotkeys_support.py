@@ -1,45 +1,70 @@
+import functools
 from typing import Optional
 
 
+@functools.lru_cache(maxsize=None)
+def _shift_keys(keyboard_module) -> frozenset:
+    key = keyboard_module.Key
+    return frozenset((key.shift, key.shift_l, key.shift_r))
+
+
 def is_shift_key(key, keyboard_module) -> bool:
-    return key in (
-        keyboard_module.Key.shift,
-        keyboard_module.Key.shift_l,
-        keyboard_module.Key.shift_r,
-    )
+    # Runs inside the global keyboard hook for every keystroke, so the Shift
+    # set is built once per keyboard module instead of per call.
+    return key in _shift_keys(keyboard_module)
+
+
+def hold_delay_loop(app) -> None:
+    # One long-lived worker replaces a threading.Timer (and its thread) per
+    # press. Stale tokens are still rejected by start_recording_if_valid.
+    while True:
+        request = app._hold_requests.get()
+        if request is None:
+            return
+        token, cancel = request
+        if not cancel.wait(app.hold_delay_sec):
+            app._start_recording_if_valid(token)
+
+
+def _ensure_hold_worker(app, threading_module) -> None:
+    thread = app._hold_thread
+    if thread is not None and thread.is_alive():
+        return
+    thread = threading_module.Thread(target=hold_delay_loop, args=(app,), daemon=True)
+    app._hold_thread = thread
+    thread.start()
 
 
 def on_press(app, key, keyboard_module, threading_module) -> Optional[bool]:
     if is_shift_key(key, keyboard_module):
-        timer_to_start = None
+        token = None
         with app._lock:
             app._ctrl_count += 1
             if app._ctrl_count == 1:
                 app._press_token += 1
                 token = app._press_token
-                timer_to_start = threading_module.Timer(
-                    app.hold_delay_sec, app._start_recording_if_valid, args=(token,)
-                )
-                timer_to_start.daemon = True
-                app._hold_timer = timer_to_start
-        if timer_to_start is not None:
-            timer_to_start.start()
+        if token is not None:
+            _ensure_hold_worker(app, threading_module)
+            # A fresh event per press so a quick re-press can't un-cancel the
+            # previous wait.
+            cancel = threading_module.Event()
+            app._hold_cancel = cancel
+            app._hold_requests.put((token, cancel))
     return None
 
 
 def on_release(app, key, keyboard_module) -> Optional[bool]:
     if is_shift_key(key, keyboard_module):
-        timer_to_cancel = None
+        released = False
         should_stop = False
         with app._lock:
             app._ctrl_count = max(0, app._ctrl_count - 1)
             if app._ctrl_count == 0:
                 app._press_token += 1
-                timer_to_cancel = app._hold_timer
-                app._hold_timer = None
+                released = True
                 should_stop = app._recording
-        if timer_to_cancel is not None:
-            timer_to_cancel.cancel()
+        if released:
+            app._hold_cancel.set()
         if should_stop:
             app._stop_recording()
     return None
@@ -57,14 +82,12 @@ def start_recording_if_valid(app, token: int) -> None:
 
 
 def request_shutdown(app, reason: str = "shutdown") -> None:
-    timer_to_cancel = None
     with app._lock:
         if app._stop_event.is_set():
             return
         app._stop_event.set()
-        timer_to_cancel = app._hold_timer
-        app._hold_timer = None
-    if timer_to_cancel is not None:
-        timer_to_cancel.cancel()
+    app._settings_request_event.set()
+    app._hold_cancel.set()
+    app._hold_requests.put(None)
     app._stop_recording()
     print(f"Exit requested ({reason}).")
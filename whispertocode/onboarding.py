@@ -3,12 +3,134 @@ from __future__ import annotations
 from dataclasses import replace
 from typing import Optional
 
-from .config_store import AppSettings
+from .config_store import AppSettings, settings_as_dict
+from .constants import NEMOTRON_REASONING_BUDGET_MAX, NEMOTRON_REASONING_PRINT_LIMIT_MAX
+
+_MAX_TOKENS_LIMIT = 1 << 20
+_QT_INT_MAX = (1 << 31) - 1
+_MAX_SPIN_DECIMALS = 10
+
+_WIZARD_QSS = """
+    QWizard {
+        background: #121214;
+        color: rgba(255, 255, 255, 0.9);
+        font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
+    }
+    QWizardPage {
+        background: transparent;
+    }
+    QLabel {
+        color: rgba(255, 255, 255, 0.9);
+        font-size: 14px;
+    }
+    QLabel#onboardingMeta {
+        color: rgba(255, 255, 255, 0.5);
+        font-size: 13px;
+        letter-spacing: 0.3px;
+        font-weight: 500;
+    }
+    QFrame#onboardingCard {
+        background: #18181a;
+        border: 1px solid rgba(255, 255, 255, 0.08);
+        border-radius: 12px;
+    }
+    QLineEdit, QSpinBox, QDoubleSpinBox {
+        background: #121214;
+        border: 1px solid rgba(255, 255, 255, 0.12);
+        border-radius: 8px;
+        color: rgba(255, 255, 255, 0.9);
+        padding: 10px 14px;
+        font-size: 14px;
+        selection-background-color: rgba(255, 255, 255, 0.2);
+    }
+    QLineEdit:focus, QSpinBox:focus, QDoubleSpinBox:focus {
+        border: 1px solid rgba(255, 255, 255, 0.4);
+        background: #1a1a1c;
+    }
+    QCheckBox {
+        spacing: 12px;
+        color: rgba(255, 255, 255, 0.9);
+        font-size: 14px;
+    }
+    QCheckBox::indicator {
+        width: 20px;
+        height: 20px;
+        border-radius: 6px;
+        border: 1px solid rgba(255, 255, 255, 0.15);
+        background: #121214;
+    }
+    QCheckBox::indicator:hover {
+        border: 1px solid rgba(255, 255, 255, 0.3);
+    }
+    QCheckBox::indicator:checked {
+        border: 1px solid rgba(255, 255, 255, 0.9);
+        background: rgba(255, 255, 255, 0.2);
+    }
+    QPushButton {
+        background: rgba(255, 255, 255, 0.05);
+        color: rgba(255, 255, 255, 0.9);
+        border: 1px solid rgba(255, 255, 255, 0.1);
+        border-radius: 8px;
+        padding: 8px 20px;
+        font-size: 14px;
+        font-weight: 500;
+        min-width: 100px;
+    }
+    QPushButton:hover {
+        background: rgba(255, 255, 255, 0.1);
+        border: 1px solid rgba(255, 255, 255, 0.2);
+    }
+    QPushButton:pressed {
+        background: rgba(255, 255, 255, 0.15);
+        border: 1px solid rgba(255, 255, 255, 0.3);
+    }
+    QPushButton#qt_wizard_nextbutton, QPushButton#qt_wizard_finishbutton {
+        background: #ffffff;
+        border: 1px solid #ffffff;
+        color: #121214;
+        font-weight: 600;
+    }
+    QPushButton#qt_wizard_nextbutton:hover, QPushButton#qt_wizard_finishbutton:hover {
+        background: #e6e6e6;
+        border: 1px solid #e6e6e6;
+    }
+    QPushButton#qt_wizard_nextbutton:pressed, QPushButton#qt_wizard_finishbutton:pressed {
+        background: #cccccc;
+        border: 1px solid #cccccc;
+    }
+"""
+
+_REVIEW_TEMPLATE = (
+    "API key: {key_status}\n"
+    "Riva server: {riva_server}\n"
+    "Riva function ID: {riva_function_id}\n"
+    "Nemotron URL: {nemotron_base_url}\n"
+    "Nemotron model: {nemotron_model}\n"
+    "Temperature / top_p: {nemotron_temperature} / {nemotron_top_p}\n"
+    "Max tokens: {nemotron_max_tokens}\n"
+    "Reasoning budget: {nemotron_reasoning_budget}\n"
+    "Reasoning print limit: {nemotron_reasoning_print_limit}\n"
+    "Enable thinking: {nemotron_enable_thinking}"
+)
+
+
+# (QtCore, QtGui, QtWidgets), bound on the first onboarding run and reused
+# when settings are reopened.
+_QT_MODULES: Optional[tuple] = None
+
+
+def _qt_modules() -> tuple:
+    global _QT_MODULES
+    if _QT_MODULES is None:
+        from PySide6 import QtCore, QtGui, QtWidgets
+
+        _QT_MODULES = (QtCore, QtGui, QtWidgets)
+    return _QT_MODULES
 
 
 def run_onboarding(initial: AppSettings) -> Optional[AppSettings]:
     try:
-        from PySide6 import QtCore, QtGui, QtWidgets
+        QtCore, QtGui, QtWidgets = _qt_modules()
     except Exception as exc:
         raise RuntimeError(f"Onboarding UI is unavailable: {exc}") from exc
 
@@ -73,97 +195,7 @@ class _OnboardingWizard:
         self._install_shortcuts()
 
     def _apply_visual_theme(self) -> None:
-        self._wizard.setStyleSheet(
-            """
-            QWizard {
-                background: #121214;
-                color: rgba(255, 255, 255, 0.9);
-                font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
-            }
-            QWizardPage {
-                background: transparent;
-            }
-            QLabel {
-                color: rgba(255, 255, 255, 0.9);
-                font-size: 14px;
-            }
-            QLabel#onboardingMeta {
-                color: rgba(255, 255, 255, 0.5);
-                font-size: 13px;
-                letter-spacing: 0.3px;
-                font-weight: 500;
-            }
-            QFrame#onboardingCard {
-                background: #18181a;
-                border: 1px solid rgba(255, 255, 255, 0.08);
-                border-radius: 12px;
-            }
-            QLineEdit {
-                background: #121214;
-                border: 1px solid rgba(255, 255, 255, 0.12);
-                border-radius: 8px;
-                color: rgba(255, 255, 255, 0.9);
-                padding: 10px 14px;
-                font-size: 14px;
-                selection-background-color: rgba(255, 255, 255, 0.2);
-            }
-            QLineEdit:focus {
-                border: 1px solid rgba(255, 255, 255, 0.4);
-                background: #1a1a1c;
-            }
-            QCheckBox {
-                spacing: 12px;
-                color: rgba(255, 255, 255, 0.9);
-                font-size: 14px;
-            }
-            QCheckBox::indicator {
-                width: 20px;
-                height: 20px;
-                border-radius: 6px;
-                border: 1px solid rgba(255, 255, 255, 0.15);
-                background: #121214;
-            }
-            QCheckBox::indicator:hover {
-                border: 1px solid rgba(255, 255, 255, 0.3);
-            }
-            QCheckBox::indicator:checked {
-                border: 1px solid rgba(255, 255, 255, 0.9);
-                background: rgba(255, 255, 255, 0.2);
-            }
-            QPushButton {
-                background: rgba(255, 255, 255, 0.05);
-                color: rgba(255, 255, 255, 0.9);
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 8px;
-                padding: 8px 20px;
-                font-size: 14px;
-                font-weight: 500;
-                min-width: 100px;
-            }
-            QPushButton:hover {
-                background: rgba(255, 255, 255, 0.1);
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            QPushButton:pressed {
-                background: rgba(255, 255, 255, 0.15);
-                border: 1px solid rgba(255, 255, 255, 0.3);
-            }
-            QPushButton#qt_wizard_nextbutton, QPushButton#qt_wizard_finishbutton {
-                background: #ffffff;
-                border: 1px solid #ffffff;
-                color: #121214;
-                font-weight: 600;
-            }
-            QPushButton#qt_wizard_nextbutton:hover, QPushButton#qt_wizard_finishbutton:hover {
-                background: #e6e6e6;
-                border: 1px solid #e6e6e6;
-            }
-            QPushButton#qt_wizard_nextbutton:pressed, QPushButton#qt_wizard_finishbutton:pressed {
-                background: #cccccc;
-                border: 1px solid #cccccc;
-            }
-            """
-        )
+        self._wizard.setStyleSheet(_WIZARD_QSS)
 
     def _install_shortcuts(self) -> None:
         esc_shortcut = self._qt_gui.QShortcut(
@@ -273,18 +305,25 @@ class _OnboardingWizard:
         nem_form.setSpacing(10)
         self._nem_base_url_input = qt_widgets.QLineEdit(self._initial.nemotron_base_url)
         self._nem_model_input = qt_widgets.QLineEdit(self._initial.nemotron_model)
-        self._temperature_input = qt_widgets.QLineEdit(
-            str(self._initial.nemotron_temperature)
+        # Typed spin boxes reject unparsable input as it is typed. Their
+        # ranges widen to include the stored value, so opening and saving
+        # the wizard never rewrites a setting the user didn't touch.
+        self._temperature_input = self._build_double_spin_box(
+            0.0, 2.0, self._initial.nemotron_temperature
+        )
+        self._top_p_input = self._build_double_spin_box(
+            0.0, 1.0, self._initial.nemotron_top_p
         )
-        self._top_p_input = qt_widgets.QLineEdit(str(self._initial.nemotron_top_p))
-        self._max_tokens_input = qt_widgets.QLineEdit(
-            str(self._initial.nemotron_max_tokens)
+        self._max_tokens_input = self._build_spin_box(
+            1, _MAX_TOKENS_LIMIT, self._initial.nemotron_max_tokens
         )
-        self._reasoning_budget_input = qt_widgets.QLineEdit(
-            str(self._initial.nemotron_reasoning_budget)
+        self._reasoning_budget_input = self._build_spin_box(
+            0, NEMOTRON_REASONING_BUDGET_MAX, self._initial.nemotron_reasoning_budget
         )
-        self._reasoning_print_limit_input = qt_widgets.QLineEdit(
-            str(self._initial.nemotron_reasoning_print_limit)
+        self._reasoning_print_limit_input = self._build_spin_box(
+            0,
+            NEMOTRON_REASONING_PRINT_LIMIT_MAX,
+            self._initial.nemotron_reasoning_print_limit,
         )
         self._enable_thinking_checkbox = qt_widgets.QCheckBox("Enable thinking")
         self._enable_thinking_checkbox.setChecked(self._initial.nemotron_enable_thinking)
@@ -348,6 +387,24 @@ class _OnboardingWizard:
         card.setObjectName("onboardingCard")
         return card
 
+    def _build_spin_box(self, minimum: int, maximum: int, value: int):
+        value = max(-_QT_INT_MAX, min(int(value), _QT_INT_MAX))
+        spin_box = self._qt_widgets.QSpinBox()
+        spin_box.setRange(min(minimum, value), max(maximum, value))
+        spin_box.setValue(value)
+        return spin_box
+
+    def _build_double_spin_box(self, minimum: float, maximum: float, value: float):
+        value = float(value)
+        spin_box = self._qt_widgets.QDoubleSpinBox()
+        # Qt rounds to the displayed decimals, so show as many as the stored
+        # value needs (e.g. 0.955) to keep it from being rounded on save.
+        spin_box.setDecimals(_decimals_for(value))
+        spin_box.setSingleStep(0.05)
+        spin_box.setRange(min(minimum, value), max(maximum, value))
+        spin_box.setValue(value)
+        return spin_box
+
     def _mode_next_id(self) -> int:
         return 2 if self._customize_checkbox.isChecked() else 4
 
@@ -391,24 +448,10 @@ class _OnboardingWizard:
                 )
                 return False
 
-        if _parse_float(self._temperature_input.text()) is None:
-            self._show_invalid("NEMOTRON_TEMPERATURE must be a valid number.")
-            return False
-        top_p = _parse_float(self._top_p_input.text())
-        if top_p is None or top_p < 0.0 or top_p > 1.0:
+        top_p = self._top_p_input.value()
+        if top_p < 0.0 or top_p > 1.0:
             self._show_invalid("NEMOTRON_TOP_P must be in range 0..1.")
             return False
-        if _parse_int(self._max_tokens_input.text()) is None:
-            self._show_invalid("NEMOTRON_MAX_TOKENS must be a valid integer.")
-            return False
-        if _parse_int(self._reasoning_budget_input.text()) is None:
-            self._show_invalid("NEMOTRON_REASONING_BUDGET must be a valid integer.")
-            return False
-        if _parse_int(self._reasoning_print_limit_input.text()) is None:
-            self._show_invalid(
-                "NEMOTRON_REASONING_PRINT_LIMIT must be a valid integer."
-            )
-            return False
         return True
 
     def _show_invalid(self, message: str) -> None:
@@ -418,18 +461,7 @@ class _OnboardingWizard:
         settings = self.collect_settings()
         key_status = "configured" if settings.nvidia_api_key else "missing"
         self._review_label.setText(
-            (
-                f"API key: {key_status}\n"
-                f"Riva server: {settings.riva_server}\n"
-                f"Riva function ID: {settings.riva_function_id}\n"
-                f"Nemotron URL: {settings.nemotron_base_url}\n"
-                f"Nemotron model: {settings.nemotron_model}\n"
-                f"Temperature / top_p: {settings.nemotron_temperature} / {settings.nemotron_top_p}\n"
-                f"Max tokens: {settings.nemotron_max_tokens}\n"
-                f"Reasoning budget: {settings.nemotron_reasoning_budget}\n"
-                f"Reasoning print limit: {settings.nemotron_reasoning_print_limit}\n"
-                f"Enable thinking: {settings.nemotron_enable_thinking}"
-            )
+            _REVIEW_TEMPLATE.format(key_status=key_status, **settings_as_dict(settings))
         )
 
     def exec(self) -> int:
@@ -442,40 +474,21 @@ class _OnboardingWizard:
         if not customize:
             return replace(self._initial, nvidia_api_key=key)
 
-        temperature = _parse_float(self._temperature_input.text())
-        top_p = _parse_float(self._top_p_input.text())
-        max_tokens = _parse_int(self._max_tokens_input.text())
-        reasoning_budget = _parse_int(self._reasoning_budget_input.text())
-        reasoning_print_limit = _parse_int(self._reasoning_print_limit_input.text())
-
         return AppSettings(
             nvidia_api_key=key,
             riva_server=self._riva_server_input.text().strip(),
             riva_function_id=self._riva_function_input.text().strip(),
             nemotron_base_url=self._nem_base_url_input.text().strip(),
             nemotron_model=self._nem_model_input.text().strip(),
-            nemotron_temperature=temperature if temperature is not None else 1.0,
-            nemotron_top_p=top_p if top_p is not None else 1.0,
-            nemotron_max_tokens=max_tokens if max_tokens is not None else 16384,
-            nemotron_reasoning_budget=(
-                reasoning_budget if reasoning_budget is not None else 4096
-            ),
-            nemotron_reasoning_print_limit=(
-                reasoning_print_limit if reasoning_print_limit is not None else 600
-            ),
+            nemotron_temperature=self._temperature_input.value(),
+            nemotron_top_p=self._top_p_input.value(),
+            nemotron_max_tokens=self._max_tokens_input.value(),
+            nemotron_reasoning_budget=self._reasoning_budget_input.value(),
+            nemotron_reasoning_print_limit=self._reasoning_print_limit_input.value(),
             nemotron_enable_thinking=self._enable_thinking_checkbox.isChecked(),
         )
 
 
-def _parse_float(raw: str) -> Optional[float]:
-    try:
-        return float(raw.strip())
-    except (TypeError, ValueError):
-        return None
-
-
-def _parse_int(raw: str) -> Optional[int]:
-    try:
-        return int(raw.strip())
-    except (TypeError, ValueError):
-        return None
+def _decimals_for(value: float) -> int:
+    text = f"{value:.{_MAX_SPIN_DECIMALS}f}".rstrip("0")
+    return max(2, len(text) - text.index(".") - 1)
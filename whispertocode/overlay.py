@@ -1,3 +1,4 @@
+import collections
 import math
 import queue
 import threading
@@ -5,8 +6,54 @@ import time
 from typing import Any, Optional, Tuple
 
 from .constants import OVERLAY_FPS, OVERLAY_HEIGHT, OVERLAY_WIDTH, OUTPUT_MODE_RAW, OUTPUT_MODE_SMART
+from .utils import lazy_import
+
+np = lazy_import("numpy")
+
+_BAR_COUNT = 20
+_BAR_GAP = 4
+_BAR_PADDING_X = 24
+_BAR_PADDING_Y = 12
+_BAR_MIN_LEVEL = 0.05
+_LEVEL_SENSITIVITY = 1.35
+_RAW_UPPER = OUTPUT_MODE_RAW.upper()
+_SMART_UPPER = OUTPUT_MODE_SMART.upper()
+
+
+def _bar_width(widget_width: int) -> float:
+    available_width = widget_width - (_BAR_PADDING_X * 2)
+    return max(2.0, (available_width - (_BAR_COUNT - 1) * _BAR_GAP) / _BAR_COUNT)
+
+
+def _bar_strip_rect(widget_width: int, widget_height: int) -> Tuple[int, int, int, int]:
+    # Dirty rect covering every bar as painted (the 2px minimum bar width can
+    # push the strip past the padding), plus 1px for antialiased edges.
+    span = _BAR_COUNT * _bar_width(widget_width) + (_BAR_COUNT - 1) * _BAR_GAP
+    return (
+        _BAR_PADDING_X - 1,
+        _BAR_PADDING_Y - 1,
+        math.ceil(span) + 2,
+        widget_height - 2 * _BAR_PADDING_Y + 2,
+    )
+
+
+def _compute_bar_levels(now: float, phases, gains, sensitive_level: float, out):
+    # Smooth sine wave pulse scaled by level and position, written into a
+    # preallocated buffer so a frame allocates no temporary arrays.
+    np.add(phases, now * 3.5, out=out)
+    np.sin(out, out=out)
+    np.abs(out, out=out)
+    out *= 0.7
+    out += 0.3
+    out *= gains
+    out *= sensitive_level
+    return np.clip(out, _BAR_MIN_LEVEL, 1.0, out=out)
+
 
 class _CapsuleOverlayWidget:
+    # Per-bar position gains by bar count, shared by every widget instance.
+    _GAIN_CACHE: "dict[int, Any]" = {}
+
     def __init__(self, qt_core, qt_gui, qt_widgets, width: int, height: int) -> None:
         self._qt_core = qt_core
         self._qt_gui = qt_gui
@@ -27,10 +74,13 @@ class _CapsuleOverlayWidget:
         self._widget.setAttribute(qt_core.Qt.WA_TransparentForMouseEvents, True)
         self._widget.setFocusPolicy(qt_core.Qt.NoFocus)
 
-        self._mode = OUTPUT_MODE_RAW.upper()
+        self._mode = _RAW_UPPER
         self._target_level = 0.0
         self._display_level = 0.0
-        self._phases = [idx * 0.4 for idx in range(40)]
+        # float64: monotonic() * 3.5 would lose the phase offsets in float32.
+        self._phases = np.arange(_BAR_COUNT, dtype=np.float64) * 0.4
+        self._position_gains = self._position_gains_for(_BAR_COUNT)
+        self._bar_levels = np.empty(_BAR_COUNT, dtype=np.float64)
         self._last_tick = time.monotonic()
 
         self._target_opacity = 0.0
@@ -38,9 +88,17 @@ class _CapsuleOverlayWidget:
         self._base_x = 0
         self._base_y = 0
         self._current_y = 0.0
+        # Placement is recomputed only after a screen signal invalidates it.
+        self._geom_dirty = True
+        self._watched_screen = None
+
+        # Static capsule background, re-rendered only when size or DPR change.
+        self._bg_pixmap = None
+        self._bg_key: Optional[Tuple[int, int, float]] = None
 
         self._paint_hook = self._build_paint_hook()
         self._widget.paintEvent = self._paint_hook  # type: ignore[assignment]
+        self._watch_screens()
         self._place_bottom_center()
 
     @staticmethod
@@ -54,51 +112,82 @@ class _CapsuleOverlayWidget:
         smooth_tail = tail * tail * (3.0 - 2.0 * tail)
         return 0.35 + (0.65 * smooth_tail)
 
+    @classmethod
+    def _position_gains_for(cls, count: int):
+        gains = cls._GAIN_CACHE.get(count)
+        if gains is None:
+            gains = np.array([cls._bar_position_gain(idx, count) for idx in range(count)])
+            gains.setflags(write=False)
+            cls._GAIN_CACHE[count] = gains
+        return gains
+
+    def _background_pixmap(self):
+        size = self._widget.size()
+        ratio = float(self._widget.devicePixelRatioF())
+        key = (size.width(), size.height(), ratio)
+        if self._bg_pixmap is not None and self._bg_key == key:
+            return self._bg_pixmap
+
+        qt_gui = self._qt_gui
+        pixmap = qt_gui.QPixmap(round(size.width() * ratio), round(size.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(self._qt_core.Qt.transparent)
+        painter = qt_gui.QPainter(pixmap)
+        painter.setRenderHint(qt_gui.QPainter.Antialiasing, True)
+
+        capsule_rect = self._widget.rect().adjusted(2, 2, -2, -2)
+
+        # Premium Apple-like Aesthetic: deep opaque background
+        painter.setPen(qt_gui.QPen(qt_gui.QColor(255, 255, 255, 25), 1))
+        painter.setBrush(qt_gui.QColor(18, 18, 20, 255))
+
+        # Perfect pill shape (radius is exactly half the height)
+        radius = capsule_rect.height() / 2.0
+        painter.drawRoundedRect(capsule_rect, radius, radius)
+        painter.end()
+
+        self._bg_pixmap = pixmap
+        self._bg_key = key
+        return pixmap
+
     def _build_paint_hook(self):
         qt_gui = self._qt_gui
+        # Invariant for the widget's lifetime: resolve once, not per frame.
+        widget = self._widget
+        painter_cls = qt_gui.QPainter
+        antialiasing = painter_cls.Antialiasing
+        path_cls = qt_gui.QPainterPath
+        rect_cls = self._qt_core.QRectF
+        # White bars with premium opacity; built once, reused every frame.
+        bar_brush = qt_gui.QBrush(qt_gui.QColor(255, 255, 255, 230))
 
         def _paint(_event) -> None:
-            painter = qt_gui.QPainter(self._widget)
-            painter.setRenderHint(qt_gui.QPainter.Antialiasing, True)
+            painter = painter_cls(widget)
+            painter.setRenderHint(antialiasing, True)
+            painter.drawPixmap(0, 0, self._background_pixmap())
 
-            rect = self._widget.rect()
-            capsule_rect = rect.adjusted(2, 2, -2, -2)
-            
-            # Premium Apple-like Aesthetic: deep opaque background
-            painter.setPen(qt_gui.QPen(qt_gui.QColor(255, 255, 255, 25), 1))
-            painter.setBrush(qt_gui.QColor(18, 18, 20, 255))
-            
-            # Perfect pill shape (radius is exactly half the height)
-            radius = capsule_rect.height() / 2.0
-            painter.drawRoundedRect(capsule_rect, radius, radius)
-
-            bar_count = 20
-            bar_gap = 4
-            horizontal_padding = 24
-            vertical_padding = 12
-            
-            available_width = self._widget.width() - (horizontal_padding * 2)
-            bar_width = max(2.0, (available_width - (bar_count - 1) * bar_gap) / bar_count)
+            bar_gap = _BAR_GAP
+            horizontal_padding = _BAR_PADDING_X
+            vertical_padding = _BAR_PADDING_Y
+            height = widget.height()
+
+            bar_width = _bar_width(widget.width())
             base_x = horizontal_padding
-            center_y = self._widget.height() / 2.0
-            max_bar_height = self._widget.height() - (vertical_padding * 2)
+            center_y = height / 2.0
+            max_bar_height = height - (vertical_padding * 2)
 
             now = time.monotonic()
             
             # Keep responsiveness for speech while preserving headroom.
-            sensitive_level = min(1.0, self._display_level * 1.35)
-            
-            # White bars with premium opacity
-            color = qt_gui.QColor(255, 255, 255, 230)
-            painter.setPen(self._qt_core.Qt.NoPen)
-            painter.setBrush(color)
-
-            for idx in range(bar_count):
-                # Smooth sine wave pulse + random jitter from display level
-                pulse = 0.3 + 0.7 * abs(math.sin(now * 3.5 + self._phases[idx]))
-                position_gain = self._bar_position_gain(idx, bar_count)
-                bar_level = max(0.05, min(1.0, sensitive_level * pulse * position_gain))
-                
+            sensitive_level = min(1.0, self._display_level * _LEVEL_SENSITIVITY)
+
+            bar_levels = _compute_bar_levels(
+                now, self._phases, self._position_gains, sensitive_level, self._bar_levels
+            )
+
+            # All bars go into one path so Qt rasterizes them in a single fill.
+            bars_path = path_cls()
+            for idx, bar_level in enumerate(bar_levels.tolist()):
                 # Minimum height to show tiny dots when silent
                 bar_h = max(bar_width, max_bar_height * bar_level)
                 
@@ -106,20 +195,38 @@ class _CapsuleOverlayWidget:
                 y = center_y - (bar_h / 2.0)
                 
                 # Draw bar with perfectly rounded ends (capsule within a capsule)
-                bar_rect = self._qt_core.QRectF(x, y, bar_width, bar_h)
-                painter.drawRoundedRect(bar_rect, bar_width / 2.0, bar_width / 2.0)
+                bar_rect = rect_cls(x, y, bar_width, bar_h)
+                bars_path.addRoundedRect(bar_rect, bar_width / 2.0, bar_width / 2.0)
 
+            painter.fillPath(bars_path, bar_brush)
             painter.end()
 
         return _paint
 
+    def _invalidate_geometry(self, *_args) -> None:
+        self._geom_dirty = True
+
+    def _watch_screens(self) -> None:
+        app = self._qt_gui.QGuiApplication.instance()
+        if app is None:
+            return
+        app.screenAdded.connect(self._invalidate_geometry)
+        app.screenRemoved.connect(self._invalidate_geometry)
+        app.primaryScreenChanged.connect(self._invalidate_geometry)
+
     def _place_bottom_center(self) -> None:
+        if not self._geom_dirty:
+            return
         screen = self._qt_gui.QGuiApplication.primaryScreen()
         if screen is None:
             return
+        if screen is not self._watched_screen:
+            screen.availableGeometryChanged.connect(self._invalidate_geometry)
+            self._watched_screen = screen
         geometry = screen.availableGeometry()
         self._base_x = geometry.x() + int((geometry.width() - self._widget.width()) / 2)
         self._base_y = geometry.y() + geometry.height() - self._widget.height() - 20
+        self._geom_dirty = False
         if self._target_opacity > 0 and abs(self._current_opacity - self._target_opacity) < 0.01:
             self._current_y = float(self._base_y)
             self._widget.move(self._base_x, int(self._current_y))
@@ -146,7 +253,7 @@ class _CapsuleOverlayWidget:
 
     def set_mode(self, mode: str) -> None:
         normalized = (mode or OUTPUT_MODE_RAW).strip().upper()
-        self._mode = OUTPUT_MODE_SMART.upper() if normalized == OUTPUT_MODE_SMART.upper() else OUTPUT_MODE_RAW.upper()
+        self._mode = _SMART_UPPER if normalized == _SMART_UPPER else _RAW_UPPER
         if self._widget.isVisible():
             self._widget.update()
 
@@ -156,8 +263,15 @@ class _CapsuleOverlayWidget:
 
     def animate_step(self) -> None:
         now = time.monotonic()
+        if self._target_opacity == 0.0 and self._current_opacity <= 0.0 and not self._widget.isVisible():
+            # Fully faded out, which is most of the app's lifetime: skip the
+            # easing math and let the level settle where it would have ended.
+            self._last_tick = now
+            self._display_level = self._target_level
+            return
         dt = max(0.001, now - self._last_tick)
         self._last_tick = now
+        previous_level = self._display_level
         up_speed = min(0.95, 8.0 * dt)
         down_speed = min(0.95, 4.5 * dt)
         if self._target_level > self._display_level:
@@ -166,24 +280,30 @@ class _CapsuleOverlayWidget:
             self._display_level += (self._target_level - self._display_level) * down_speed
         self._display_level = max(0.0, min(self._display_level, 1.0))
 
-        if hasattr(self, "_target_opacity"):
-            anim_speed = min(1.0, 15.0 * dt)
-            if abs(self._target_opacity - self._current_opacity) > 0.001:
-                self._current_opacity += (self._target_opacity - self._current_opacity) * anim_speed
-                if abs(self._target_opacity - self._current_opacity) < 0.001:
-                    self._current_opacity = self._target_opacity
-                self._widget.setWindowOpacity(self._current_opacity)
-
-                target_y = float(self._base_y) if self._target_opacity > 0.5 else float(self._base_y + 10)
-                self._current_y += (target_y - self._current_y) * anim_speed
-                if self._current_opacity > 0.0:
-                    self._widget.move(self._base_x, int(self._current_y))
-
-                if self._current_opacity <= 0.0 and self._widget.isVisible():
-                    self._widget.hide()
-
-        if self._widget.isVisible():
-            self._widget.update()
+        anim_speed = min(1.0, 15.0 * dt)
+        if abs(self._target_opacity - self._current_opacity) > 0.001:
+            self._current_opacity += (self._target_opacity - self._current_opacity) * anim_speed
+            if abs(self._target_opacity - self._current_opacity) < 0.001:
+                self._current_opacity = self._target_opacity
+            self._widget.setWindowOpacity(self._current_opacity)
+
+            target_y = float(self._base_y) if self._target_opacity > 0.5 else float(self._base_y + 10)
+            self._current_y += (target_y - self._current_y) * anim_speed
+            if self._current_opacity > 0.0:
+                self._widget.move(self._base_x, int(self._current_y))
+
+            if self._current_opacity <= 0.0 and self._widget.isVisible():
+                self._widget.hide()
+
+        # Opacity and position are window-level, so only the bar strip ever
+        # needs repainting: while the level moves, or while the bars pulse
+        # above their floor. A quiet overlay sits at the floor and is static.
+        if not self._widget.isVisible():
+            return
+        level_moved = abs(self._display_level - previous_level) > 1e-3
+        bars_pulsing = self._display_level * _LEVEL_SENSITIVITY > _BAR_MIN_LEVEL
+        if level_moved or bars_pulsing:
+            self._widget.update(*_bar_strip_rect(self._widget.width(), self._widget.height()))
 
 
 class QtCapsuleOverlayController:
@@ -191,10 +311,13 @@ class QtCapsuleOverlayController:
         self._width = width
         self._height = height
         self._fps = max(10, fps)
-        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        # deque append/popleft are atomic in CPython, which is all this
+        # many-producer, single-consumer (UI thread) channel needs.
+        self._commands: "collections.deque[Tuple[str, Any]]" = collections.deque()
         self._ready_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
         self._startup_error: Optional[Exception] = None
+        self._pending_level: Optional[float] = None
 
     def start(self, timeout_sec: float = 3.0) -> None:
         if self._thread is not None and self._thread.is_alive():
@@ -209,18 +332,20 @@ class QtCapsuleOverlayController:
             raise RuntimeError(self._startup_error)
 
     def show_recording(self, mode: str) -> None:
-        self._queue.put(("show", mode))
+        self._commands.append(("show", mode))
 
     def set_mode(self, mode: str) -> None:
-        self._queue.put(("mode", mode))
+        self._commands.append(("mode", mode))
 
     def update_level(self, level: float) -> None:
-        self._queue.put(("level", level))
+        # Latest value wins; the UI tick picks it up once per frame, so the
+        # audio thread never queues more level updates than get rendered.
+        self._pending_level = level
 
     def run_onboarding_dialog(self, initial_settings):
         response_queue: "queue.Queue[Any]" = queue.Queue(maxsize=1)
         done_event = threading.Event()
-        self._queue.put(("onboarding", (initial_settings, response_queue, done_event)))
+        self._commands.append(("onboarding", (initial_settings, response_queue, done_event)))
         done_event.wait()
         result = response_queue.get()
         if isinstance(result, Exception):
@@ -228,10 +353,10 @@ class QtCapsuleOverlayController:
         return result
 
     def hide(self) -> None:
-        self._queue.put(("hide", None))
+        self._commands.append(("hide", None))
 
     def shutdown(self) -> None:
-        self._queue.put(("shutdown", None))
+        self._commands.append(("shutdown", None))
         thread = self._thread
         if thread is not None and thread.is_alive():
             thread.join(timeout=1.0)
@@ -260,18 +385,27 @@ class QtCapsuleOverlayController:
             timer = QtCore.QTimer()
             timer.setInterval(int(1000 / self._fps))
 
+            # Last level handed to the widget. _pending_level is never reset,
+            # so a write racing with this read can't be lost; comparing
+            # against what was applied skips unchanged frames instead.
+            applied_level: Optional[float] = None
+
             def _tick() -> None:
-                while True:
-                    try:
-                        cmd, value = self._queue.get_nowait()
-                    except queue.Empty:
-                        break
+                nonlocal applied_level
+                # A run of mode switches only needs its last value applied;
+                # it is flushed before any other command to keep ordering.
+                latest_mode: Optional[str] = None
+                commands = self._commands
+                while commands:
+                    cmd, value = commands.popleft()
+                    if cmd == "mode":
+                        latest_mode = str(value)
+                        continue
+                    if latest_mode is not None:
+                        overlay.set_mode(latest_mode)
+                        latest_mode = None
                     if cmd == "show":
                         overlay.show_recording(str(value))
-                    elif cmd == "mode":
-                        overlay.set_mode(str(value))
-                    elif cmd == "level":
-                        overlay.set_level(float(value))
                     elif cmd == "hide":
                         overlay.hide()
                     elif cmd == "onboarding":
@@ -295,6 +429,12 @@ class QtCapsuleOverlayController:
                         overlay.close()
                         app.quit()
                         return
+                if latest_mode is not None:
+                    overlay.set_mode(latest_mode)
+                level = self._pending_level
+                if level is not None and level != applied_level:
+                    applied_level = level
+                    overlay.set_level(float(level))
                 overlay.animate_step()
 
             timer.timeout.connect(_tick)
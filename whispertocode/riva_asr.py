@@ -1,23 +1,68 @@
+from __future__ import annotations
+
 import time
-from typing import Tuple
+from typing import Iterator, Tuple
 
-import numpy as np
-import riva.client
+from .constants import STREAM_CHUNK_SEC
+from .utils import lazy_import
 
+np = lazy_import("numpy")
+riva_client = lazy_import("riva.client")
 
-def recognize_audio(
-    asr_service: riva.client.ASRService,
-    *,
-    audio: np.ndarray,
-    sample_rate: int,
-    language: str,
-) -> Tuple[str, float]:
+# Keep the TLS channel alive between utterances so the first request after
+# an idle period doesn't pay for a fresh handshake.
+_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 10000),
+    ("grpc.keepalive_timeout_ms", 5000),
+    ("grpc.http2.min_time_between_pings_ms", 10000),
+]
+_WARMUP_SEC = 0.2
+# gRPC status names meaning the endpoint can't stream at all, as opposed to
+# a transient failure (timeout, reset, UNAVAILABLE) worth retrying next time.
+_STREAMING_UNSUPPORTED_CODES = frozenset({"UNIMPLEMENTED", "INVALID_ARGUMENT"})
+
+
+def connect_asr_service(server: str, metadata: list) -> Tuple[riva_client.Auth, riva_client.ASRService]:
+    try:
+        auth = riva_client.Auth(
+            uri=server,
+            use_ssl=True,
+            metadata_args=metadata,
+            options=_CHANNEL_OPTIONS,
+        )
+    except TypeError:
+        # Older riva clients don't accept channel options.
+        auth = riva_client.Auth(uri=server, use_ssl=True, metadata_args=metadata)
+    return auth, riva_client.ASRService(auth)
+
+
+def warm_up_asr_service(asr_service: riva_client.ASRService, *, sample_rate: int, language: str) -> None:
+    # A short silent request forces the TLS handshake and HTTP/2 stream setup
+    # before the first real utterance; failures surface on real requests.
+    try:
+        recognize_audio(
+            asr_service,
+            audio=np.zeros(int(sample_rate * _WARMUP_SEC), dtype=np.int16),
+            sample_rate=sample_rate,
+            language=language,
+        )
+    except Exception:
+        pass
+
+
+def _pcm16(audio: np.ndarray) -> np.ndarray:
+    if audio.dtype == np.int16:
+        return audio
+    # Float input (e.g. from callers outside the int16 capture path): clip
+    # and scale in one scratch array instead of two temporaries.
     pcm16 = np.clip(audio, -1.0, 1.0)
-    pcm16 = (pcm16 * 32767.0).astype(np.int16)
-    audio_bytes = pcm16.tobytes()
+    np.multiply(pcm16, 32767.0, out=pcm16)
+    return pcm16.astype(np.int16)
 
-    config = riva.client.RecognitionConfig(
-        encoding=riva.client.AudioEncoding.LINEAR_PCM,
+
+def _recognition_config(sample_rate: int, language: str) -> riva_client.RecognitionConfig:
+    return riva_client.RecognitionConfig(
+        encoding=riva_client.AudioEncoding.LINEAR_PCM,
         sample_rate_hertz=sample_rate,
         audio_channel_count=1,
         language_code=language,
@@ -26,6 +71,19 @@ def recognize_audio(
         max_alternatives=1,
     )
 
+
+def recognize_audio(
+    asr_service: riva_client.ASRService,
+    *,
+    audio: np.ndarray,
+    sample_rate: int,
+    language: str,
+) -> Tuple[str, float]:
+    # Riva's protobuf request needs real bytes, so this is the one copy;
+    # tobytes() emits C order directly even for a strided view.
+    audio_bytes = _pcm16(audio).tobytes()
+    config = _recognition_config(sample_rate, language)
+
     start = time.time()
     response = asr_service.offline_recognize(audio_bytes, config)
     took = time.time() - start
@@ -35,3 +93,46 @@ def recognize_audio(
         if result.alternatives:
             text_parts.append(result.alternatives[0].transcript)
     return "".join(text_parts).strip(), took
+
+
+def is_streaming_unsupported(exc: Exception) -> bool:
+    # grpc.RpcError exposes code() -> grpc.StatusCode; compare by name so
+    # this module doesn't import grpc directly.
+    code = getattr(exc, "code", None)
+    if not callable(code):
+        return False
+    try:
+        status = code()
+    except Exception:
+        return False
+    return getattr(status, "name", None) in _STREAMING_UNSUPPORTED_CODES
+
+
+def recognize_audio_streaming(
+    asr_service: riva_client.ASRService,
+    *,
+    audio: np.ndarray,
+    sample_rate: int,
+    language: str,
+    chunk_sec: float = STREAM_CHUNK_SEC,
+) -> Iterator[str]:
+    # Yields final transcript segments as Riva emits them, so callers can
+    # start typing before the whole utterance has been recognized.
+    # Each request serializes its own chunk straight from the array, so the
+    # whole clip is never materialized as one bytes object first.
+    pcm16 = _pcm16(audio)
+    step = max(1, int(sample_rate * chunk_sec))
+    chunks = (pcm16[i:i + step].tobytes() for i in range(0, len(pcm16), step))
+    streaming_config = riva_client.StreamingRecognitionConfig(
+        config=_recognition_config(sample_rate, language),
+        interim_results=False,
+    )
+
+    responses = asr_service.streaming_response_generator(
+        audio_chunks=chunks,
+        streaming_config=streaming_config,
+    )
+    for response in responses:
+        for result in response.results:
+            if result.is_final and result.alternatives:
+                yield result.alternatives[0].transcript
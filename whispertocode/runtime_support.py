@@ -6,7 +6,7 @@ def startup_banner_lines(app, os_module) -> list[str]:
         ),
         f"Current mode: {app._get_output_mode().upper()}",
     ]
-    if getattr(app, "_tray_enabled", False):
+    if app._tray_enabled:
         lines.append("Tray controls: switch RAW/SMART mode, show debug console, and exit.")
     elif os_module.name == "nt":
         lines.append(
@@ -18,18 +18,23 @@ def startup_banner_lines(app, os_module) -> list[str]:
     return lines
 
 
-def run_app(app, *, keyboard_module, threading_module, time_module, os_module) -> None:
+# Upper bound on a main-loop wait: keeps Ctrl+C responsive on Windows, where a
+# blocked Event.wait() is not interrupted, and drains the audio log regularly.
+_MAIN_LOOP_WAIT_SEC = 0.5
+
+
+def run_app(app, *, keyboard_module, threading_module, os_module) -> None:
     app._start_tray()
     app._start_overlay()
     if os_module.name == "nt":
-        if getattr(app, "_tray_enabled", False):
-            if getattr(app, "_debug_console", False):
+        if app._tray_enabled:
+            if app._debug_console:
                 app._set_console_visibility(True, "startup")
             else:
                 app._set_console_visibility(False, "startup")
         else:
             app._set_console_visibility(True, "startup")
-    if getattr(app, "_debug_console", False) or not getattr(app, "_tray_enabled", False):
+    if app._debug_console or not app._tray_enabled:
         for line in app._startup_banner_lines():
             print(line)
     listener = keyboard_module.Listener(
@@ -43,9 +48,15 @@ def run_app(app, *, keyboard_module, threading_module, time_module, os_module) -
         app._local_hotkeys_thread.start()
     try:
         listener.start()
+        # Settings requests and request_shutdown() both set this event, so
+        # the main thread sleeps until there is work instead of polling.
+        wake = app._settings_request_event
         while not app._stop_event.is_set():
+            wake.wait(_MAIN_LOOP_WAIT_SEC)
+            if app._stop_event.is_set():
+                break
             app._process_pending_settings_request()
-            time_module.sleep(0.05)
+            app._flush_audio_log()
     except KeyboardInterrupt:
         app.request_shutdown("Ctrl+C")
     finally:
@@ -57,5 +68,7 @@ def run_app(app, *, keyboard_module, threading_module, time_module, os_module) -
         app._local_hotkeys_thread = None
         if local_hotkeys_thread is not None:
             local_hotkeys_thread.join(timeout=0.2)
+        app._stop_level_worker()
+        app._flush_audio_log()
         app._stop_overlay()
         app._stop_tray()
@@ -1,34 +1,53 @@
 import sys
+import time
 from typing import Any, Callable, List, Optional, Tuple
 
 from .utils import _coerce_stream_text
 
+_SMART_SYSTEM_PROMPT = (
+    "You are an expert editor for speech-to-text transcripts. "
+    "Your task is to transform the raw dictated text enclosed in <transcript> tags into clean, naturally typed text.\n\n"
+    "CORE RULES:\n"
+    "- Language & Tone: Keep the exact original language (do not translate). Preserve the speaker's original voice and tone. Do not over-formalize casual speech.\n"
+    "- Accuracy: Preserve all original meaning, facts, names, numbers, links, and technical terms. Do not add any new information.\n"
+    "- Cleanup: Remove filler words (um, uh, you know), stutters, redundancies, and false starts.\n"
+    "- Grammar & Correction: Fix punctuation, capitalization, sentence boundaries, and paragraph breaks. Correct obvious speech-to-text phonetic mishearings (homophones) based on context.\n\n"
+    "OUTPUT CONSTRAINTS:\n"
+    "- Return ONLY the final corrected text.\n"
+    "- Do NOT include greetings, explanations, or confirmation messages (e.g., 'Here is the text').\n"
+    "- Do NOT wrap the output in markdown code blocks (```) or quotes.\n"
+    "- If the input contains no meaningful words (only noise/fillers), return an empty string."
+)
+
+# Shared by every request; treat as read-only.
+_SMART_SYSTEM_MESSAGE = {"role": "system", "content": _SMART_SYSTEM_PROMPT}
+
+
 def build_smart_messages(raw_text: str) -> List[dict]:
     return [
-        {
-            "role": "system",
-            "content": (
-                "You are an expert editor for speech-to-text transcripts. "
-                "Your task is to transform the raw dictated text enclosed in <transcript> tags into clean, naturally typed text.\n\n"
-                "CORE RULES:\n"
-                "- Language & Tone: Keep the exact original language (do not translate). Preserve the speaker's original voice and tone. Do not over-formalize casual speech.\n"
-                "- Accuracy: Preserve all original meaning, facts, names, numbers, links, and technical terms. Do not add any new information.\n"
-                "- Cleanup: Remove filler words (um, uh, you know), stutters, redundancies, and false starts.\n"
-                "- Grammar & Correction: Fix punctuation, capitalization, sentence boundaries, and paragraph breaks. Correct obvious speech-to-text phonetic mishearings (homophones) based on context.\n\n"
-                "OUTPUT CONSTRAINTS:\n"
-                "- Return ONLY the final corrected text.\n"
-                "- Do NOT include greetings, explanations, or confirmation messages (e.g., 'Here is the text').\n"
-                "- Do NOT wrap the output in markdown code blocks (```) or quotes.\n"
-                "- If the input contains no meaningful words (only noise/fillers), return an empty string."
-            ),
-        },
-        {
-            "role": "user", 
-            "content": f"<transcript>\n{raw_text}\n</transcript>"
-        },
+        _SMART_SYSTEM_MESSAGE,
+        {"role": "user", "content": f"<transcript>\n{raw_text}\n</transcript>"},
     ]
 
 
+def _build_nemotron_http_client() -> Any:
+    from openai import DefaultHttpxClient
+    import httpx
+
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        http2 = False
+    else:
+        http2 = True
+
+    # Keep the TLS connection warm between utterances; httpx otherwise drops
+    # idle connections after 5s, so nearly every rewrite paid a handshake.
+    return DefaultHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60.0),
+    )
+
 
 def ensure_nemotron_client(current_client: Any, base_url: str, api_key: str) -> Any:
     if current_client is not None:
@@ -38,6 +57,7 @@ def ensure_nemotron_client(current_client: Any, base_url: str, api_key: str) ->
     return OpenAI(
         base_url=base_url,
         api_key=api_key,
+        http_client=_build_nemotron_http_client(),
     )
 
 
@@ -54,9 +74,31 @@ def rewrite_text_streaming(
     enable_thinking: bool,
     reasoning_print_limit: int,
     type_char: Callable[[str], None],
+    flush_chars: int = 16,
+    max_batch_age_sec: float = 0.02,
 ) -> Tuple[bool, Optional[Exception]]:
     typed_any = False
     reasoning_printed = False
+    # Content is typed in batches: every synthetic keystroke batch is an OS
+    # call, so short tokens are held until enough text accumulates or the
+    # batch gets old. Age is checked as each stream chunk arrives (reasoning
+    # and empty chunks included); there is no timer, so a stream that sends
+    # nothing at all holds the batch until it resumes or ends.
+    pending: List[str] = []
+    pending_len = 0
+    last_flush = time.monotonic()
+
+    def _flush() -> None:
+        nonlocal typed_any, pending_len, last_flush
+        last_flush = time.monotonic()
+        if not pending:
+            return
+        text = "".join(pending)
+        pending.clear()
+        pending_len = 0
+        type_char(text)
+        typed_any = True
+
     try:
         client = get_client()
         completion = client.chat.completions.create(
@@ -75,29 +117,35 @@ def rewrite_text_streaming(
         )
 
         for chunk in completion:
-            choices = getattr(chunk, "choices", None)
-            if not choices:
-                continue
-            delta = getattr(choices[0], "delta", None)
-            if delta is None:
-                continue
-
-            reasoning_text = _coerce_stream_text(
-                getattr(delta, "reasoning_content", None)
-            )
-            if reasoning_text:
-                print(reasoning_text, end="", flush=True)
-                reasoning_printed = True
-
-            content_text = _coerce_stream_text(getattr(delta, "content", None))
-            if content_text:
-                for char in content_text:
-                    type_char(char)
-                typed_any = True
+            choices = chunk.choices
+            delta = choices[0].delta if choices else None
+            if delta is not None:
+                # reasoning_content is a provider extension, so it may be absent.
+                reasoning_text = _coerce_stream_text(
+                    getattr(delta, "reasoning_content", None)
+                )
+                if reasoning_text:
+                    print(reasoning_text, end="", flush=False)
+                    reasoning_printed = True
+
+                content_text = _coerce_stream_text(delta.content)
+                if content_text:
+                    pending.append(content_text)
+                    pending_len += len(content_text)
+                    if pending_len >= flush_chars:
+                        _flush()
+
+            if pending and time.monotonic() - last_flush >= max_batch_age_sec:
+                _flush()
 
+        _flush()
         return typed_any, None
     except Exception as exc:
+        try:
+            _flush()
+        except Exception:
+            pass
         return typed_any, exc
     finally:
         if reasoning_printed:
-            print()
+            print(flush=True)
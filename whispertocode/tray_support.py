@@ -1,3 +1,4 @@
+import ctypes
 import os
 import sys
 import time
@@ -6,16 +7,15 @@ from .constants import OUTPUT_MODE_RAW, OUTPUT_MODE_SMART, WINDOWS_SW_HIDE, WIND
 
 
 def is_console_visible(app) -> bool:
-    with app._lock:
-        return bool(getattr(app, "_console_visible", False))
+    # Cached flag maintained by set_console_visibility(); no Win32 query and
+    # no lock needed for a single attribute read.
+    return app._console_visible
 
 
 def has_console_window() -> bool:
     if os.name != "nt":
         return False
     try:
-        import ctypes
-
         return bool(ctypes.windll.kernel32.GetConsoleWindow())
     except Exception:
         return False
@@ -33,8 +33,6 @@ def ensure_console_window(redirect_stdio=redirect_stdio_to_console) -> bool:
     if os.name != "nt":
         return False
     try:
-        import ctypes
-
         console_hwnd = ctypes.windll.kernel32.GetConsoleWindow()
         if console_hwnd:
             return True
@@ -52,8 +50,6 @@ def set_console_visibility(app, visible: bool, source: str = "") -> bool:
     if os.name != "nt":
         return False
     try:
-        import ctypes
-
         if visible and not app._ensure_console_window():
             return False
         console_hwnd = ctypes.windll.kernel32.GetConsoleWindow()
@@ -64,7 +60,7 @@ def set_console_visibility(app, visible: bool, source: str = "") -> bool:
         with app._lock:
             app._console_visible = visible
         source_suffix = f" ({source})" if source else ""
-        if visible or getattr(app, "_debug_console", False):
+        if visible or app._debug_console:
             state = "shown" if visible else "hidden"
             print(f"Debug console {state}{source_suffix}.")
         app._refresh_tray_menu()
@@ -165,15 +161,13 @@ def notify_windows_message(message: str) -> None:
     if os.name != "nt":
         return
     try:
-        import ctypes
-
         ctypes.windll.user32.MessageBoxW(0, message, "WhisperToCode", 0x00001030)
     except Exception:
         pass
 
 
 def start_tray(app) -> None:
-    if not getattr(app, "_tray_enabled", False):
+    if not app._tray_enabled:
         return
     try:
         import pystray
@@ -182,7 +176,7 @@ def start_tray(app) -> None:
         print(f"Tray disabled: {exc}", file=sys.stderr)
         app._tray_enabled = False
         app._local_hotkeys_enabled = os.name == "nt"
-        if os.name == "nt" and not getattr(app, "_debug_console", False):
+        if os.name == "nt" and not app._debug_console:
             notify_tray_unavailable(
                 f"System tray is unavailable.\nReason: {exc}\n\nFalling back to console mode."
             )
@@ -203,14 +197,14 @@ def start_tray(app) -> None:
         app._tray_enabled = False
         app._tray_available = False
         app._local_hotkeys_enabled = os.name == "nt"
-        if os.name == "nt" and not getattr(app, "_debug_console", False):
+        if os.name == "nt" and not app._debug_console:
             notify_tray_unavailable(
                 f"System tray failed to start.\nReason: {exc}\n\nFalling back to console mode."
             )
 
 
 def stop_tray(app) -> None:
-    tray_icon = getattr(app, "_tray_icon", None)
+    tray_icon = app._tray_icon
     if tray_icon is not None:
         try:
             tray_icon.stop()
@@ -220,6 +214,52 @@ def stop_tray(app) -> None:
     app._tray_available = False
 
 
+_STD_INPUT_HANDLE = -10
+_WAIT_OBJECT_0 = 0
+_STDIN_WAIT_MS = 100
+_INPUT_RECORD_SIZE = 20
+
+
+class _ConsoleInput:
+    def __init__(self, kernel32, handle) -> None:
+        self._kernel32 = kernel32
+        self._handle = handle
+        self._count = ctypes.c_ulong()
+
+    def wait(self) -> bool:
+        return self._kernel32.WaitForSingleObject(self._handle, _STDIN_WAIT_MS) == _WAIT_OBJECT_0
+
+    def queued(self) -> int:
+        if not self._kernel32.GetNumberOfConsoleInputEvents(self._handle, ctypes.byref(self._count)):
+            return 0
+        return self._count.value
+
+    def discard(self, count: int) -> None:
+        # Drop the first `count` records. Only called after kbhit() saw no
+        # key among them, so they are key-up/mouse/focus/resize records that
+        # would otherwise keep the handle signaled; later input is untouched.
+        if count <= 0:
+            return
+        buffer = ctypes.create_string_buffer(_INPUT_RECORD_SIZE * count)
+        self._kernel32.ReadConsoleInputW(self._handle, buffer, count, ctypes.byref(self._count))
+
+
+def _console_input():
+    try:
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(_STD_INPUT_HANDLE)
+    except Exception:
+        return None
+    if not handle or handle == -1:
+        return None
+    # Pipes and redirected files can stay signaled forever; only a real
+    # console input handle is safe to block on.
+    mode = ctypes.c_ulong()
+    if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        return None
+    return _ConsoleInput(kernel32, handle)
+
+
 def local_hotkeys_loop(app) -> None:
     try:
         import msvcrt
@@ -227,10 +267,25 @@ def local_hotkeys_loop(app) -> None:
         print(f"Local hotkeys disabled: {exc}", file=sys.stderr)
         return
 
+    # Sleep in the kernel until console input arrives instead of polling
+    # kbhit() ~33x/s; the timeout bounds how long shutdown takes to notice.
+    console = _console_input()
     while not app._stop_event.is_set():
         try:
+            queued = 0
+            if console is not None:
+                if not console.wait():
+                    continue
+                # Count before kbhit() so the discard below can't reach
+                # records that arrive after kbhit() scanned the buffer.
+                queued = console.queued()
             if not msvcrt.kbhit():
-                time.sleep(0.03)
+                if queued > 0:
+                    console.discard(queued)
+                else:
+                    # No console, or signaled with nothing readable to
+                    # drain: poll instead of spinning on the handle.
+                    time.sleep(0.03)
                 continue
             char = msvcrt.getwch()
         except Exception as exc:
@@ -1,23 +1,59 @@
+import importlib
 import os
 from typing import Any, List
 
 
+class _LazyModule:
+    def __init__(self, name: str) -> None:
+        self.__dict__["_lazy_name"] = name
+
+    def __getattr__(self, attr: str) -> Any:
+        # Import on first use, then cache the attribute on the proxy so later
+        # lookups are plain instance-dict hits.
+        value = getattr(importlib.import_module(self._lazy_name), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._lazy_name!r}>"
+
+
+def lazy_import(name: str) -> Any:
+    return _LazyModule(name)
+
+
+_BOOL_MAP = {
+    "1": True,
+    "true": True,
+    "yes": True,
+    "on": True,
+    "0": False,
+    "false": False,
+    "no": False,
+    "off": False,
+}
+
+
 def _parse_bool_env(name: str, default: bool) -> bool:
     value = os.getenv(name)
     if value is None:
         return default
-    normalized = value.strip().lower()
-    if normalized in {"1", "true", "yes", "on"}:
-        return True
-    if normalized in {"0", "false", "no", "off"}:
-        return False
-    return default
+    return _BOOL_MAP.get(value.strip().lower(), default)
 
 
 def _coerce_stream_text(value: Any) -> str:
     if value is None:
         return ""
-    if isinstance(value, str):
+    kind = type(value)
+    if kind is str:
+        return value
+    if kind is list:
+        # Common case: every part is already a plain string.
+        try:
+            return "".join(value)
+        except TypeError:
+            pass
+    elif isinstance(value, str):
         return value
     if isinstance(value, list):
         parts: List[str] = []